@@ -3,9 +3,20 @@ import random
 
 from abc import ABC, abstractmethod
 
+from Factory_Pattern_spatial_index import SpatialIndex
+from Factory_Pattern_registry import ShapeRegistry
+from Factory_Pattern_pool import ShapePool
+from Factory_Pattern_render_cache import ShapeLayerCache
+
+
+# shape classes by shape type, filled in by the register decorator
+shape_registry = ShapeRegistry()
 
 # Base abstract class for shapes
 class Shape(ABC):
+    # no per-instance __dict__: smaller shapes, cheaper to create and recycle
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -15,47 +26,101 @@ class Shape(ABC):
         pass
 
 # Circle class inheriting from Shape
+@shape_registry.register("Circle")
 class Circle(Shape):
-    def __init__(self, x, y):
+    __slots__ = ("radius", "color")
+
+    # rng: source of the random size and color (random.Random or the random module)
+    def __init__(self, x, y, rng=random):
         super().__init__(x, y)
-        self.radius = random.randint(10, 50)
-        self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+        self.radius = rng.randint(10, 50)
+        self.color = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
 
     # draw Circle on a given surface
     def draw(self, surface):
         pygame.draw.circle(surface, self.color, (self.x, self.y), self.radius)
 
+    # bounding rectangle, used by the spatial index
+    def get_rect(self):
+        return pygame.Rect(self.x - self.radius, self.y - self.radius, 2 * self.radius + 1, 2 * self.radius + 1)
+
+    def contains_point(self, x, y):
+        return (x - self.x) ** 2 + (y - self.y) ** 2 <= self.radius ** 2
+
 
 # Rectangle class inheriting from Shape
+@shape_registry.register("Rectangle")
 class Rectangle(Shape):
-    def __init__(self, x, y):
+    __slots__ = ("width", "height", "color")
+
+    def __init__(self, x, y, rng=random):
         super().__init__(x, y)
-        self.width = random.randint(10, 100)
-        self.height = random.randint(10, 100)
-        self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+        self.width = rng.randint(10, 100)
+        self.height = rng.randint(10, 100)
+        self.color = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
 
     # draw Rectangle on a given surface
     def draw(self, surface):
         pygame.draw.rect(surface, self.color, (self.x, self.y, self.width, self.height))
 
+    # bounding rectangle, used by the spatial index
+    def get_rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def contains_point(self, x, y):
+        return self.get_rect().collidepoint(x, y)
+
 
 # ShapeFactory class for creating shape instances (simple version)
 class ShapeFactory:
-    @staticmethod
-    def create_shape(context):
-        if context.shape_type == "Circle":
-            return Circle(context.x, context.y)
-        elif context.shape_type == "Rectangle":
-            return Rectangle(context.x, context.y)
-        else:
-            raise ValueError("Invalid shape type")
+    def __init__(self, index=None, pool=None, seed=None):
+        # optional SpatialIndex the created shapes are registered into
+        self.index = index
+        # optional ShapePool recycling released shapes
+        self.pool = pool
+        # random source of this factory: the same seed creates the same shapes
+        self.rng = random.Random(seed)
+
+    def create_shape(self, context):
+        shape = self._new_shape(shape_registry.get(context.shape_type), context.x, context.y, context.rng)
+
+        if self.index is not None:
+            self.index.insert(shape)
+        return shape
+
+    def _new_shape(self, cls, x, y, rng=None):
+        rng = self.rng if rng is None else rng
+        if self.pool is not None:
+            return self.pool.acquire(cls, x, y, rng)
+        return cls(x, y, rng)
+
+    # discard a shape created by this factory, it is recycled when there is a pool
+    def release_shape(self, shape):
+        if self.index is not None and shape in self.index:
+            self.index.remove(shape)
+        if self.pool is not None:
+            self.pool.release(shape)
+
+    # create one shape per ShapeContext, returns the list of shapes
+    def create_many(self, contexts):
+        shape_types = {context.shape_type for context in contexts}
+        classes = {shape_type: shape_registry.get(shape_type) for shape_type in shape_types}
+        shapes = [self._new_shape(classes[context.shape_type], context.x, context.y, context.rng)
+                  for context in contexts]
+
+        if self.index is not None:
+            for shape in shapes:
+                self.index.insert(shape)
+        return shapes
 
 # ShapeContext class to hold Factory parameters
 class ShapeContext:
-    def __init__(self, shape_type, x, y):
+    def __init__(self, shape_type, x, y, rng=None):
         self.shape_type = shape_type
         self.x = x
         self.y = y
+        # random source for this shape, None uses the factory's
+        self.rng = rng
 
 
 # Main function to set up and run the game loop
@@ -65,8 +130,10 @@ def main():
     pygame.display.set_caption("Random Shapes")
     clock = pygame.time.Clock()
 
-    shape_factory = ShapeFactory()
-    shapes = []  # list to store created shapes
+    shape_index = SpatialIndex()  # created shapes, indexed by position
+    shape_factory = ShapeFactory(shape_index, ShapePool())
+    # shapes composited onto a cached layer, only the changes are redrawn
+    renderer = ShapeLayerCache(screen, shape_index)
     running = True
 
     # Main game loop
@@ -75,23 +142,26 @@ def main():
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+            # remove the topmost shape under the mouse on right click
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+                shape = shape_index.shape_at(*event.pos)
+                if shape is not None:
+                    renderer.remove(shape)
+                    shape_factory.release_shape(shape)
             # create a random shape on mouse click
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 x,y = pygame.mouse.get_pos()
                 shape_type = random.choice(["Circle", "Rectangle"])
                 context = ShapeContext(shape_type, x, y)
                 shape = shape_factory.create_shape(context)
-                shapes.append(shape)
-
-        # Clear the screen
-        screen.fill((255, 255, 255))
-
-        # Draw all the shapes
-        for shape in shapes:
-            shape.draw(screen)
+                renderer.add(shape)
 
-        # Update the display
-        pygame.display.flip()
+        # Draw the new shapes and update the areas that changed
+        dirty = renderer.draw()
+        if dirty:
+            pygame.display.update(dirty)
         clock.tick(60)
 
     pygame.quit()
@@ -1,15 +1,34 @@
 import pygame
 import random
+import numpy as np
 
 from abc import ABC, abstractmethod
 from enum import Enum, auto
 
+from Factory_Pattern_spatial_index import SpatialIndex
+from Factory_Pattern_registry import ShapeRegistry
+from Factory_Pattern_pool import ShapePool
+from Factory_Pattern_render_cache import ShapeLayerCache
+from Factory_Pattern_shape_store import ShapeStore, ShapeView
+from batch_rasterizer import BatchRasterizer
+
 class ShapeType(Enum):
     CIRCLE = auto()
     RECTANGLE = auto()
 
+# How shapes are drawn: "pygame" (one Shape.draw call per shape)
+# or "batched" (the BatchRasterizer, same pixels, faster only from thousands
+# of shapes per redraw, with Shape.draw below that)
+draw_backend = "pygame"
+
+# shape classes by shape type, filled in by the register decorator
+shape_registry = ShapeRegistry()
+
 # Base abstract class for shapes
 class Shape(ABC):
+    # no per-instance __dict__: smaller shapes, cheaper to create and recycle
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -19,47 +38,134 @@ class Shape(ABC):
         pass
 
 # Circle class inheriting from Shape
+@shape_registry.register(ShapeType.CIRCLE)
 class Circle(Shape):
-    def __init__(self, x, y):
+    __slots__ = ("radius", "color")
+
+    # rng: source of the random size and color (random.Random or the random module)
+    def __init__(self, x, y, rng=random):
         super().__init__(x, y)
-        self.radius = random.randint(10, 50)
-        self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+        self.radius = rng.randint(10, 50)
+        self.color = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
 
     # draw Circle on a given surface
     def draw(self, surface):
         pygame.draw.circle(surface, self.color, (self.x, self.y), self.radius)
 
+    # bounding rectangle, used by the spatial index
+    def get_rect(self):
+        return pygame.Rect(self.x - self.radius, self.y - self.radius, 2 * self.radius + 1, 2 * self.radius + 1)
+
+    def contains_point(self, x, y):
+        return (x - self.x) ** 2 + (y - self.y) ** 2 <= self.radius ** 2
+
 
 # Rectangle class inheriting from Shape
+@shape_registry.register(ShapeType.RECTANGLE)
 class Rectangle(Shape):
-    def __init__(self, x, y):
+    __slots__ = ("width", "height", "color")
+
+    def __init__(self, x, y, rng=random):
         super().__init__(x, y)
-        self.width = random.randint(10, 100)
-        self.height = random.randint(10, 100)
-        self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+        self.width = rng.randint(10, 100)
+        self.height = rng.randint(10, 100)
+        self.color = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
 
     # draw Rectangle on a given surface
     def draw(self, surface):
         pygame.draw.rect(surface, self.color, (self.x, self.y, self.width, self.height))
 
+    # bounding rectangle, used by the spatial index
+    def get_rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def contains_point(self, x, y):
+        return self.get_rect().collidepoint(x, y)
+
+
+# views of a ShapeStore behave like shapes
+Shape.register(ShapeView)
+
 
 # ShapeFactory class for creating shape instances (simple version)
 class ShapeFactory:
-    @staticmethod
-    def create_shape(context):
-        if context.shape_type == ShapeType.CIRCLE:
-            return Circle(context.x, context.y)
-        elif context.shape_type == ShapeType.RECTANGLE:
-            return Rectangle(context.x, context.y)
+    def __init__(self, index=None, store=None, pool=None, seed=None):
+        # optional SpatialIndex the created shapes are registered into
+        self.index = index
+        # optional ShapePool recycling released shapes
+        self.pool = pool
+        # random source of this factory: the same seed creates the same shapes
+        self.rng = random.Random(seed)
+        # vectorized random source for batch creation
+        self.batch_rng = np.random.default_rng(seed)
+        # optional ShapeStore for shapes created in batches
+        self.store = store
+
+    def create_shape(self, context):
+        shape = self._new_shape(shape_registry.get(context.shape_type), context.x, context.y, context.rng)
+
+        if self.index is not None:
+            self.index.insert(shape)
+        return shape
+
+    def _new_shape(self, cls, x, y, rng=None):
+        rng = self.rng if rng is None else rng
+        if self.pool is not None:
+            return self.pool.acquire(cls, x, y, rng)
+        return cls(x, y, rng)
+
+    # discard a shape created by this factory, it is recycled when there is a pool
+    # (rows of the store are not recycled)
+    def release_shape(self, shape):
+        if self.index is not None and shape in self.index:
+            self.index.remove(shape)
+        if self.pool is not None and not isinstance(shape, ShapeView):
+            self.pool.release(shape)
+
+    # create one shape per ShapeContext, returns the list of shapes
+    def create_many(self, contexts):
+        shape_types = {context.shape_type for context in contexts}
+        classes = {shape_type: shape_registry.get(shape_type) for shape_type in shape_types}
+        shapes = [self._new_shape(classes[context.shape_type], context.x, context.y, context.rng)
+                  for context in contexts]
+
+        if self.index is not None:
+            for shape in shapes:
+                self.index.insert(shape)
+        return shapes
+
+    # create many shapes at (xs, ys) in one vectorized call, into the store;
+    # shape_type is one ShapeType, one per shape, or an array of ShapeType values;
+    # returns the range of store rows
+    def create_shapes(self, shape_type, xs, ys):
+        if self.store is None:
+            raise ValueError("Invalid factory: batch creation needs a ShapeStore")
+        if isinstance(shape_type, ShapeType):
+            kinds = shape_type.value
+        elif isinstance(shape_type, np.ndarray):
+            kinds = shape_type.astype(np.uint8)
+            if not np.isin(kinds, [t.value for t in ShapeType]).all():
+                raise ValueError("Invalid shape type")
         else:
-            raise ValueError("Invalid shape type")
+            values = {t: t.value for t in ShapeType}
+            kinds = np.fromiter((values.get(t, 0) for t in shape_type), dtype=np.uint8, count=len(xs))
+            if not kinds.all():
+                raise ValueError("Invalid shape type")
+        rows = self.store.append_random(kinds, xs, ys, self.batch_rng)
+
+        if self.index is not None:
+            for row in rows:
+                self.index.insert(self.store.view(row))
+        return rows
 
 # ShapeContext class to hold Factory parameters
 class ShapeContext:
-    def __init__(self, shape_type, x, y):
+    def __init__(self, shape_type, x, y, rng=None):
         self.shape_type = shape_type
         self.x = x
         self.y = y
+        # random source for this shape, None uses the factory's
+        self.rng = rng
 
 
 # Main function to set up and run the game loop
@@ -69,8 +175,11 @@ def main():
     pygame.display.set_caption("Random Shapes")
     clock = pygame.time.Clock()
 
-    shape_factory = ShapeFactory()
-    shapes = []  # list to store created shapes
+    shape_index = SpatialIndex()  # created shapes, indexed by position
+    shape_factory = ShapeFactory(shape_index, ShapeStore(), ShapePool())
+    # shapes composited onto a cached layer, only the changes are redrawn
+    rasterizer = BatchRasterizer() if draw_backend == "batched" else None
+    renderer = ShapeLayerCache(screen, shape_index, rasterizer=rasterizer)
     running = True
 
     # Main game loop
@@ -79,23 +188,34 @@ def main():
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+            # remove the topmost shape under the mouse on right click
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+                shape = shape_index.shape_at(*event.pos)
+                if shape is not None:
+                    renderer.remove(shape)
+                    shape_factory.release_shape(shape)
             # create a random shape on mouse click
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 x,y = pygame.mouse.get_pos()
                 shape_type = random.choice(list(ShapeType))
                 context = ShapeContext(shape_type, x, y)
                 shape = shape_factory.create_shape(context)
-                shapes.append(shape)
-
-        # Clear the screen
-        screen.fill((255, 255, 255))
-
-        # Draw all the shapes
-        for shape in shapes:
-            shape.draw(screen)
-
-        # Update the display
-        pygame.display.flip()
+                renderer.add(shape)
+            # create 1000 random shapes at once on "B"
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_b:
+                n = 1000
+                shape_types = random.choices(list(ShapeType), k=n)
+                xs = np.random.randint(0, screen.get_width(), n)
+                ys = np.random.randint(0, screen.get_height(), n)
+                rows = shape_factory.create_shapes(shape_types, xs, ys)
+                renderer.add_many(shape_factory.store.views(rows))
+
+        # Draw the new shapes and update the areas that changed
+        dirty = renderer.draw()
+        if dirty:
+            pygame.display.update(dirty)
         clock.tick(60)
 
     pygame.quit()
@@ -0,0 +1,204 @@
+import sys
+import json
+import time
+import zlib
+import argparse
+
+# selects pygame's dummy video driver, so it is imported before pygame
+from benchmark_common import peak_memory, environment
+
+import numpy as np
+import pygame
+
+from Factory_Pattern_3 import ShapeFactory, ShapeContext, ShapeType
+from Factory_Pattern_shape_store import ShapeStore
+from batch_rasterizer import BatchRasterizer
+from Factory_Pattern_render_cache import ShapeLayerCache
+from Factory_Pattern_spatial_index import SpatialIndex
+
+# Reproducible benchmarks of shape creation and drawing for the
+# Factory_Pattern demos, runnable without a display. Positions, types,
+# sizes and colors all come from seeded random sources, so two runs with the
+# same seed create and draw the same shapes: every draw benchmark reports a
+# CRC of the resulting pixels to check that (and that the drawing backends
+# agree with each other). Every benchmark prints one JSON line.
+#   create/objects  ShapeFactory.create_many(), one Python object per shape
+#   create/store    ShapeFactory.create_shapes() into a ShapeStore
+#   draw/pygame     Shape.draw() per shape
+#   draw/batched    BatchRasterizer on the shape objects
+#   draw/store      BatchRasterizer on the ShapeStore columns
+# The draw benchmarks above force the batch on every size. At the sizes of
+# the Factory_Pattern_3 demo, its ShapeLayerCache is timed with each backend:
+# "pygame", "batched" (the default thresholds of BatchRasterizer) and
+# "forced" (always batched):
+#   cache/full/<backend>    redraw of the whole 800x600 layer
+#   cache/remove/<backend>  redraw of the area of one removed shape
+#
+#   python Factory_Pattern_benchmark.py --sizes 1000 10000 100000 1000000 --seed 1
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# shapes on the screen of the demo, created one click at a time
+DEMO_SIZES = [10, 100, 1_000]
+SCREEN_SIZE = (800, 600)
+
+
+def _positions(n, seed):
+    rng = np.random.default_rng(seed)
+    kinds = rng.integers(1, 3, n, dtype=np.uint8)
+    xs = rng.integers(0, SCREEN_SIZE[0], n)
+    ys = rng.integers(0, SCREEN_SIZE[1], n)
+    return kinds, xs, ys
+
+
+def _best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _record(name, n, seconds, **extra):
+    return {
+        "benchmark": name,
+        "name": f"{name}/{n}",
+        "shapes": n,
+        "seconds": round(seconds, 6),
+        "shapes_per_second": round(n / seconds) if seconds > 0 else None,
+        **extra,
+    }
+
+
+def _pixels_crc(surface):
+    return zlib.crc32(pygame.image.tobytes(surface, "RGB"))
+
+
+def bench_shapes(n, seed=0, repeat=3, objects=True, memory=True):
+    kinds, xs, ys = _positions(n, seed)
+    results = []
+    surface = pygame.Surface(SCREEN_SIZE).convert(pygame.display.get_surface())
+    rasterizer = BatchRasterizer(min_batch=0, pixels_per_shape=None)
+
+    def draw(name, draw_function, shapes):
+        def run():
+            surface.fill((255, 255, 255))
+            draw_function(shapes)
+        seconds, _ = _best_time(run, repeat)
+        results.append(_record(name, n, seconds, pixels_crc=_pixels_crc(surface)))
+
+    if objects:
+        contexts = [ShapeContext(ShapeType(kind), x, y) for kind, x, y in zip(kinds.tolist(), xs.tolist(), ys.tolist())]
+
+        def create_objects():
+            return ShapeFactory(seed=seed).create_many(contexts)
+
+        seconds, shapes = _best_time(create_objects, repeat)
+        extra = {"peak_memory_bytes": peak_memory(create_objects)} if memory else {}
+        results.append(_record("create/objects", n, seconds, **extra))
+
+        def draw_pygame(shapes):
+            for shape in shapes:
+                shape.draw(surface)
+
+        draw("draw/pygame", draw_pygame, shapes)
+        draw("draw/batched", lambda shapes: rasterizer.draw_shapes(surface, shapes), shapes)
+        del shapes
+
+    def create_store():
+        factory = ShapeFactory(store=ShapeStore(capacity=n), seed=seed)
+        factory.create_shapes(kinds, xs, ys)
+        return factory.store
+
+    seconds, store = _best_time(create_store, repeat)
+    extra = {"peak_memory_bytes": peak_memory(create_store)} if memory else {}
+    results.append(_record("create/store", n, seconds, store_bytes=store.nbytes, **extra))
+    draw("draw/store", lambda store: rasterizer.draw_store(surface, store), store)
+    return results
+
+
+def bench_cache(n, seed=0, repeat=3):
+    kinds, xs, ys = _positions(n, seed)
+    contexts = [ShapeContext(ShapeType(kind), x, y) for kind, x, y in zip(kinds.tolist(), xs.tolist(), ys.tolist())]
+    index = SpatialIndex()
+    shapes = ShapeFactory(index, seed=seed).create_many(contexts)
+    screen = pygame.display.get_surface()
+    # the same shape, in the middle of the scene, is removed on every run
+    removed = shapes[len(shapes) // 2] if shapes else None
+    backends = {
+        "pygame": None,
+        "batched": BatchRasterizer(),
+        "forced": BatchRasterizer(min_batch=0, pixels_per_shape=None),
+    }
+    caches = {backend: ShapeLayerCache(screen, index, rasterizer=rasterizer) for backend, rasterizer in backends.items()}
+    results = []
+    for backend, cache in caches.items():
+        def full():
+            cache.invalidate()
+            cache.draw()
+        seconds, _ = _best_time(full, repeat)
+        results.append(_record(f"cache/full/{backend}", n, seconds, pixels_crc=_pixels_crc(cache.layer)))
+
+    if removed is None:
+        return results
+    # timed after the full redraws: inserted again, the shape goes on top
+    for backend, cache in caches.items():
+        def remove():
+            cache.remove(removed)
+            index.remove(removed)
+            cache.draw()
+            index.insert(removed)
+        seconds, _ = _best_time(remove, repeat)
+        results.append(_record(f"cache/remove/{backend}", n, seconds))
+    return results
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, seed=0, repeat=3, max_objects=100_000, memory=True, report=None,
+                   demo_sizes=DEMO_SIZES):
+    results = [environment()]
+    if report:
+        report(results[0])
+    pygame.init()
+    try:
+        pygame.display.set_mode(SCREEN_SIZE)
+        for n in demo_sizes:
+            for result in bench_cache(n, seed, repeat):
+                results.append(result)
+                if report:
+                    report(result)
+        for n in sizes:
+            for result in bench_shapes(n, seed, repeat, objects=n <= max_objects, memory=memory):
+                results.append(result)
+                if report:
+                    report(result)
+    finally:
+        pygame.quit()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark shape creation and drawing headlessly.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="numbers of shapes (default: 1000 10000 100000 1000000)")
+    parser.add_argument("--demo-sizes", type=int, nargs="*", default=DEMO_SIZES,
+                        help="numbers of shapes of the demo scene benchmarks (default: 10 100 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the shapes (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the best is kept (default: 3)")
+    parser.add_argument("--max-objects", type=int, default=100_000,
+                        help="largest size also benchmarked with one Python object per shape (default: 100000)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurements")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def report(result):
+        print(json.dumps(result), flush=True)
+
+    run_benchmarks(args.sizes, args.seed, args.repeat, args.max_objects, not args.no_memory, report, args.demo_sizes)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+# Object pool for the shapes of the Factory_Pattern demos.
+# Released shapes are kept in a free list per shape class and handed out
+# again by acquire(), re-initialized in place with the new position, so a
+# scene that creates and discards shapes at a steady rate stops allocating
+# shape objects once the pool is warm. Released shapes must not be used
+# (or released again) by the caller afterwards.
+
+
+class ShapePool:
+    def __init__(self, max_free=1024):
+        # most released shapes kept per shape class, the others are dropped
+        self.max_free = max_free
+        self._free = {}
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    # a shape created as cls(*args), recycled when one is free
+    def acquire(self, cls, *args):
+        free = self._free.get(cls)
+        if free:
+            shape = free.pop()
+            shape.__init__(*args)
+            self.hits += 1
+            return shape
+        self.misses += 1
+        return cls(*args)
+
+    def release(self, shape):
+        free = self._free.setdefault(type(shape), [])
+        if len(free) < self.max_free:
+            free.append(shape)
+        else:
+            self.dropped += 1
+
+    # number of free shapes (of one class, or all of them)
+    def free_count(self, cls=None):
+        if cls is not None:
+            return len(self._free.get(cls, ()))
+        return sum(len(free) for free in self._free.values())
+
+    @property
+    def hit_rate(self):
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "free": self.free_count(),
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,69 @@
+import importlib
+from importlib.metadata import entry_points
+
+# Registry of shape classes for the ShapeFactory of the Factory_Pattern demos.
+# Shape classes register themselves under their shape type with a decorator:
+#
+#   shape_registry = ShapeRegistry()
+#
+#   @shape_registry.register(ShapeType.CIRCLE)
+#   class Circle(Shape):
+#       ...
+#
+# and the factory looks the class up in a dict instead of walking an if/elif
+# chain, then creates the shape as cls(x, y, rng). Rarely used shapes can be
+# registered lazily as "module:ClassName" (or through package entry points),
+# their module is only imported the first time such a shape is created.
+
+
+class ShapeRegistry:
+    def __init__(self):
+        self._classes = {}
+        # shape type -> "module:ClassName", imported on first use
+        self._lazy = {}
+
+    # class decorator registering a shape class under `shape_type`
+    def register(self, shape_type):
+        def decorator(cls):
+            if shape_type in self._classes:
+                raise ValueError(f"Shape type already registered: {shape_type}")
+            self._classes[shape_type] = cls
+            self._lazy.pop(shape_type, None)
+            return cls
+        return decorator
+
+    def register_lazy(self, shape_type, target):
+        if shape_type in self._classes:
+            raise ValueError(f"Shape type already registered: {shape_type}")
+        self._lazy[shape_type] = target
+
+    # register the entry points of a group lazily, `key` turns an entry point
+    # name into a shape type
+    def load_entry_points(self, group, key=None):
+        for entry_point in entry_points(group=group):
+            name = entry_point.name if key is None else key(entry_point.name)
+            self.register_lazy(name, entry_point.value)
+
+    def get(self, shape_type):
+        cls = self._classes.get(shape_type)
+        if cls is None:
+            cls = self._import(shape_type)
+        return cls
+
+    def _import(self, shape_type):
+        target = self._lazy.get(shape_type)
+        if target is None:
+            raise ValueError("Invalid shape type")
+        module_name, _, class_name = target.partition(":")
+        module = importlib.import_module(module_name)
+        # the module may have registered the class with the decorator
+        if shape_type not in self._classes:
+            self._classes[shape_type] = getattr(module, class_name)
+            del self._lazy[shape_type]
+        return self._classes[shape_type]
+
+    def __contains__(self, shape_type):
+        return shape_type in self._classes or shape_type in self._lazy
+
+    def shape_types(self):
+        return list(self._classes) + list(self._lazy)
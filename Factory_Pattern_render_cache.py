@@ -0,0 +1,91 @@
+import pygame
+
+# Cached rendering for the Factory_Pattern demos.
+# Shapes do not move once created, so they are composited onto a persistent
+# layer surface instead of being redrawn every frame: a new shape is drawn
+# once on top of the layer, and removing a shape only redraws the shapes of
+# the spatial index that overlap the area it covered. draw() copies the
+# changed areas to the screen and returns them for pygame.display.update(),
+# so the cost of a frame depends on what changed, not on the number of shapes.
+# With a BatchRasterizer (batch_rasterizer.py) the shapes are
+# drawn in batches instead of one Shape.draw() call each.
+
+
+class ShapeLayerCache:
+    def __init__(self, screen, index, background=(255, 255, 255), max_dirty=64, rasterizer=None):
+        self.screen = screen
+        # SpatialIndex with every shape on screen, in drawing order
+        self.index = index
+        self.background = background
+        # above this many changed areas, update their union instead
+        self.max_dirty = max_dirty
+        self.rasterizer = rasterizer
+        self.layer = pygame.Surface(screen.get_size()).convert(screen)
+        self._added = []
+        self._removed = []
+        self._full = True
+
+    # force a full redraw on the next frame
+    def invalidate(self):
+        self._full = True
+
+    # a shape that was just created (and registered in the index)
+    def add(self, shape):
+        self._added.append(shape)
+
+    def add_many(self, shapes):
+        self._added.extend(shapes)
+
+    # a shape about to be released, call before the shape is recycled
+    def remove(self, shape):
+        self._removed.append(pygame.Rect(shape.get_rect()))
+
+    def _draw_shapes(self, shapes):
+        if self.rasterizer is not None:
+            self.rasterizer.draw_shapes(self.layer, shapes)
+        else:
+            for shape in shapes:
+                shape.draw(self.layer)
+
+    def _redraw_full(self):
+        self.layer.fill(self.background)
+        self._draw_shapes(self.index.visible(self.layer.get_rect()))
+
+    # redraw the shapes below an area that was uncovered
+    def _redraw_area(self, area):
+        self.layer.set_clip(area)
+        self.layer.fill(self.background, area)
+        self._draw_shapes(self.index.query_rect(area))
+        self.layer.set_clip(None)
+
+    # bring the layer up to date and copy the changed areas to the screen,
+    # returns the rectangles that changed
+    def draw(self):
+        bounds = self.layer.get_rect()
+        if self._full:
+            self._redraw_full()
+            dirty = [bounds]
+        else:
+            dirty = []
+            for area in self._removed:
+                area = area.clip(bounds)
+                if area:
+                    self._redraw_area(area)
+                    dirty.append(area)
+            # new shapes are the newest ones: they go on top
+            added = []
+            for shape in self._added:
+                area = pygame.Rect(shape.get_rect()).clip(bounds)
+                if area and shape in self.index:
+                    added.append(shape)
+                    dirty.append(area)
+            self._draw_shapes(added)
+            if len(dirty) > self.max_dirty:
+                dirty = [dirty[0].unionall(dirty[1:])]
+
+        self._full = False
+        self._added.clear()
+        self._removed.clear()
+        for area in dirty:
+            self.screen.blit(self.layer, area, area)
+        return dirty
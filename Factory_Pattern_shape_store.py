@@ -0,0 +1,186 @@
+import pygame
+import numpy as np
+
+from batch_rasterizer import CIRCLE, RECTANGLE
+
+# Columnar storage for large numbers of shapes of Factory_Pattern_3.py.
+# Instead of one Python object per shape, every attribute is a column in a
+# NumPy array (16 bytes per shape), and shapes are created in batches with
+# one vectorized call. Lightweight views give per-shape access with the same
+# interface as the Shape classes: x, y, color, draw(surface), get_rect().
+# The store is append-only: rows are never moved, so a view stays valid.
+
+# shape kinds (CIRCLE, RECTANGLE) are the values of ShapeType in
+# Factory_Pattern_3.py
+
+
+class ShapeStore:
+    def __init__(self, capacity=1024, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._size = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = self.__dict__.get("kind")
+        columns = {
+            "kind": np.zeros(capacity, dtype=np.uint8),
+            "x": np.zeros(capacity, dtype=np.int32),
+            "y": np.zeros(capacity, dtype=np.int32),
+            # radius of circles in `width`
+            "width": np.zeros(capacity, dtype=np.uint16),
+            "height": np.zeros(capacity, dtype=np.uint16),
+            "color": np.zeros((capacity, 3), dtype=np.uint8),
+        }
+        for name, column in columns.items():
+            if old is not None:
+                column[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, column)
+
+    @property
+    def capacity(self):
+        return len(self.kind)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ("kind", "x", "y", "width", "height", "color"))
+
+    # append shapes with the given columns, returns the range of their rows
+    def append(self, kind, x, y, width, height, color):
+        n = len(x)
+        start = self._size
+        if start + n > self.capacity:
+            self._allocate(max(start + n, 2 * self.capacity))
+        rows = slice(start, start + n)
+        self.kind[rows] = kind
+        self.x[rows] = x
+        self.y[rows] = y
+        self.width[rows] = width
+        self.height[rows] = height
+        self.color[rows] = color
+        self._size = start + n
+        return range(start, start + n)
+
+    # append shapes at (xs, ys) with random sizes and colors, like the
+    # Circle and Rectangle constructors but for all shapes at once;
+    # rng: a NumPy Generator, the store's by default
+    def append_random(self, kind, xs, ys, rng=None):
+        rng = self.rng if rng is None else rng
+        n = len(xs)
+        kind = np.broadcast_to(np.asarray(kind, dtype=np.uint8), (n,))
+        circles = kind == CIRCLE
+        radius = rng.integers(10, 51, n, dtype=np.uint16)
+        width = np.where(circles, radius, rng.integers(10, 101, n, dtype=np.uint16))
+        height = np.where(circles, radius, rng.integers(10, 101, n, dtype=np.uint16))
+        color = rng.integers(0, 256, (n, 3), dtype=np.uint8)
+        return self.append(kind, xs, ys, width, height, color)
+
+    def view(self, row):
+        if not 0 <= row < self._size:
+            raise IndexError(f"Invalid shape row: {row}")
+        return _VIEW_TYPES[int(self.kind[row])](self, row)
+
+    def views(self, rows=None):
+        rows = range(self._size) if rows is None else rows
+        return [self.view(row) for row in rows]
+
+    def __iter__(self):
+        for row in range(self._size):
+            yield self.view(row)
+
+
+# per-shape view of one row of a ShapeStore
+class ShapeView:
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    @property
+    def x(self):
+        return int(self.store.x[self.row])
+
+    @x.setter
+    def x(self, value):
+        self.store.x[self.row] = value
+
+    @property
+    def y(self):
+        return int(self.store.y[self.row])
+
+    @y.setter
+    def y(self, value):
+        self.store.y[self.row] = value
+
+    @property
+    def color(self):
+        return tuple(self.store.color[self.row].tolist())
+
+    @color.setter
+    def color(self, value):
+        self.store.color[self.row] = value
+
+    # views of the same row are the same shape
+    def __eq__(self, other):
+        return isinstance(other, ShapeView) and self.store is other.store and self.row == other.row
+
+    def __hash__(self):
+        return hash((id(self.store), self.row))
+
+
+class CircleView(ShapeView):
+    __slots__ = ()
+
+    @property
+    def radius(self):
+        return int(self.store.width[self.row])
+
+    @radius.setter
+    def radius(self, value):
+        self.store.width[self.row] = value
+        self.store.height[self.row] = value
+
+    def draw(self, surface):
+        pygame.draw.circle(surface, self.color, (self.x, self.y), self.radius)
+
+    def get_rect(self):
+        radius = self.radius
+        return pygame.Rect(self.x - radius, self.y - radius, 2 * radius + 1, 2 * radius + 1)
+
+    def contains_point(self, x, y):
+        return (x - self.x) ** 2 + (y - self.y) ** 2 <= self.radius ** 2
+
+
+class RectangleView(ShapeView):
+    __slots__ = ()
+
+    @property
+    def width(self):
+        return int(self.store.width[self.row])
+
+    @width.setter
+    def width(self, value):
+        self.store.width[self.row] = value
+
+    @property
+    def height(self):
+        return int(self.store.height[self.row])
+
+    @height.setter
+    def height(self, value):
+        self.store.height[self.row] = value
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.color, (self.x, self.y, self.width, self.height))
+
+    def get_rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def contains_point(self, x, y):
+        return self.get_rect().collidepoint(x, y)
+
+
+_VIEW_TYPES = {CIRCLE: CircleView, RECTANGLE: RectangleView}
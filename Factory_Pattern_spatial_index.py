@@ -0,0 +1,120 @@
+import pygame
+
+# Uniform grid spatial index for the shapes of the Factory_Pattern demos.
+# The plane is divided into square cells of `cell_size` pixels and every
+# shape is registered in the cells its bounding rectangle (shape.get_rect())
+# overlaps, so point and rectangle queries only look at the shapes of the
+# nearby cells instead of every shape of the scene.
+# Queries return shapes in insertion order, which is also the drawing order
+# (the last shape is drawn on top).
+
+
+class SpatialIndex:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        # (cell x, cell y) -> shapes overlapping the cell
+        self._cells = {}
+        # shape -> insertion number, in insertion order
+        self._order = {}
+        # shape -> bounding rectangle it was registered with
+        self._rects = {}
+        self._next = 0
+        # union of all bounding rectangles (not shrunk on removal)
+        self._bounds = None
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __contains__(self, shape):
+        return shape in self._order
+
+    def _cell_range(self, rect):
+        size = self.cell_size
+        return (range(rect.left // size, (rect.right - 1) // size + 1),
+                range(rect.top // size, (rect.bottom - 1) // size + 1))
+
+    def _register(self, shape, rect):
+        self._rects[shape] = rect
+        xs, ys = self._cell_range(rect)
+        for cx in xs:
+            for cy in ys:
+                self._cells.setdefault((cx, cy), set()).add(shape)
+        self._bounds = rect.copy() if self._bounds is None else self._bounds.union(rect)
+
+    def _unregister(self, shape):
+        rect = self._rects.pop(shape)
+        xs, ys = self._cell_range(rect)
+        for cx in xs:
+            for cy in ys:
+                cell = self._cells[cx, cy]
+                cell.discard(shape)
+                if not cell:
+                    del self._cells[cx, cy]
+
+    def insert(self, shape):
+        if shape in self._order:
+            raise ValueError("Shape is already in the index")
+        self._order[shape] = self._next
+        self._next += 1
+        self._register(shape, pygame.Rect(shape.get_rect()))
+        return shape
+
+    def remove(self, shape):
+        self._unregister(shape)
+        del self._order[shape]
+
+    # call after a shape moved or changed size, it keeps its drawing order
+    def update(self, shape):
+        self._unregister(shape)
+        self._register(shape, pygame.Rect(shape.get_rect()))
+
+    def _sorted(self, shapes):
+        order = self._order
+        return sorted(shapes, key=order.__getitem__)
+
+    # shapes covering the point (x, y), bottom to top
+    def query_point(self, x, y):
+        cell = self._cells.get((x // self.cell_size, y // self.cell_size), ())
+        hits = []
+        for shape in cell:
+            if not self._rects[shape].collidepoint(x, y):
+                continue
+            # exact test for shapes that are not rectangles
+            if hasattr(shape, "contains_point") and not shape.contains_point(x, y):
+                continue
+            hits.append(shape)
+        return self._sorted(hits)
+
+    # the topmost shape covering the point (x, y), or None
+    def shape_at(self, x, y):
+        hits = self.query_point(x, y)
+        return hits[-1] if hits else None
+
+    # shapes whose bounding rectangle overlaps `rect`, bottom to top
+    def query_rect(self, rect):
+        rect = pygame.Rect(rect)
+        if self._bounds is None or not rect.colliderect(self._bounds):
+            return []
+        if rect.contains(self._bounds):
+            return list(self._order)
+
+        xs, ys = self._cell_range(rect.clip(self._bounds))
+        candidates = set()
+        if len(xs) * len(ys) <= len(self._cells):
+            for cx in xs:
+                for cy in ys:
+                    candidates.update(self._cells.get((cx, cy), ()))
+        else:
+            # fewer occupied cells than cells in the rectangle
+            for (cx, cy), cell in self._cells.items():
+                if cx in xs and cy in ys:
+                    candidates.update(cell)
+        rects = self._rects
+        return self._sorted(shape for shape in candidates if rect.colliderect(rects[shape]))
+
+    # viewport culling: the shapes to draw for the visible area, in drawing order
+    def visible(self, viewport):
+        return self.query_rect(viewport)
@@ -1,11 +1,32 @@
 from abc import ABC, abstractmethod
 import pygame
 import random
+import numpy as np
+
+from Observer_Pattern_async import AsyncDispatcher
+from Observer_Pattern_bulk import RectangleGroup
+from Observer_Pattern_regions import union_rects
+from Observer_Pattern_registry import ObserverRegistry
+from Observer_Pattern_scheduler import NotificationScheduler
+
+# seconds between two notifications of the observers, 0 notifies once per frame
+notify_interval = 0.0
+# rectangles only react to the circle moving over them
+notify_nearby_only = False
+# run the observers on worker threads instead of in the frame loop
+async_notify = False
+notify_workers = 2
+notify_queue_size = 256
+# "block", "drop-oldest" or "coalesce" when a worker queue is full
+notify_policy = "coalesce"
+# small rectangles in the background, recolored together by one RectangleGroup observer
+bulk_rectangles = 0
 
 # Observer interface
 class Observer(ABC):
+    # `changes` maps the changed attributes of the subject to (old, new)
     @abstractmethod
-    def update(self, subject):
+    def update(self, subject, changes=None):
         pass
 
 # Concrete observer class
@@ -20,32 +41,59 @@ class Rectangle(Observer):
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
 
-    def update(self, subject):
+    def update(self, subject, changes=None):
         self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
 
+# a RectangleGroup is a single observer for many rectangles
+Observer.register(RectangleGroup)
+
 # Subject class
 class Circle:
-    def __init__(self, x, y, radius, color):
+    def __init__(self, x, y, radius, color, scheduler=None, dispatcher=None):
         self.x = x
         self.y = y
         self.radius = radius
         self.color = color
-        self.observers = []
+        # observers are held weakly, see Observer_Pattern_registry.py
+        self.observers = ObserverRegistry()
+        # NotificationScheduler coalescing the notifications, None notifies right away
+        self.scheduler = scheduler
+        # AsyncDispatcher running the notifications, None runs them in notify()
+        self.dispatcher = dispatcher
 
     def draw(self, screen):
         pygame.draw.circle(screen, self.color, (self.x, self.y), self.radius)
 
-    def attach(self, observer):
-        self.observers.append(observer)
+    def get_rect(self):
+        return (self.x - self.radius, self.y - self.radius, 2 * self.radius + 1, 2 * self.radius + 1)
+
+    # returns the handle to detach the observer with; `topics` and `region`
+    # limit the events the observer is notified of
+    def attach(self, observer, weak=True, topics=None, region=None):
+        return self.observers.attach(observer, weak, topics, region)
 
-    def notify(self):
-        for observer in self.observers:
-            observer.update(self)
+    def detach(self, handle):
+        return self.observers.detach(handle)
+
+    # notify the observers interested in `topics` and `area`, all of them by default
+    def notify(self, changes=None, topics=None, area=None):
+        for observer in self.observers.select(topics, area):
+            if self.dispatcher is not None:
+                self.dispatcher.submit(observer, self, changes)
+            else:
+                observer.update(self, changes)
 
     def move(self, x, y):
+        changes = {"x": (self.x, x), "y": (self.y, y)}
+        old_rect = self.get_rect()
         self.x = x
         self.y = y
-        self.notify()
+        # the area where the circle was and where it is now
+        area = union_rects(old_rect, self.get_rect())
+        if self.scheduler is not None:
+            self.scheduler.changed(self, changes, "move", area)
+        else:
+            self.notify(changes, ("move",), area)
 
 def main():
     pygame.init()
@@ -55,8 +103,16 @@ def main():
     running = True
     clock = pygame.time.Clock()
 
+    # runs the notifications on worker threads
+    dispatcher = None
+    if async_notify:
+        dispatcher = AsyncDispatcher(notify_workers, notify_queue_size, notify_policy)
+
+    # coalesces the moves of each frame into one notification
+    scheduler = NotificationScheduler(notify_interval, dispatcher=dispatcher)
+
     # Instance of our Publisher
-    circle = Circle(400, 300, 50, (255, 255, 255))
+    circle = Circle(400, 300, 50, (255, 255, 255), scheduler)
 
     # Three instances of our subscriber/observer classes.
     rectangles = [
@@ -67,7 +123,16 @@ def main():
 
     # Add the three rectangles as our Subsribers to the Circle class
     for rect in rectangles:
-        circle.attach(rect)
+        region = (rect.x, rect.y, rect.width, rect.height) if notify_nearby_only else None
+        circle.attach(rect, topics="move", region=region)
+
+    # many more rectangles, notified as a single observer
+    group = RectangleGroup(bulk_rectangles)
+    if bulk_rectangles:
+        xs = np.random.randint(0, 790, bulk_rectangles)
+        ys = np.random.randint(0, 590, bulk_rectangles)
+        group.add_many(xs, ys, 10, 10, np.random.randint(0, 256, (bulk_rectangles, 3)))
+        circle.attach(group, topics="move")
 
     # Start the game loop
     while running:
@@ -79,6 +144,9 @@ def main():
             if event.type == pygame.QUIT:
                 running = False
 
+        # draw the background rectangles
+        group.draw(screen)
+
         # draw the circle at its current position
         circle.draw(screen)
 
@@ -93,11 +161,16 @@ def main():
         if pygame.mouse.get_pressed()[0]:
             circle.move(*mouse_pos) # drag the circle
 
+        # notify the observers of this frame's changes
+        scheduler.flush()
+
         # display the screen buffer (i.e. screen contents)
         pygame.display.flip()
         # generate 60 frames per second
         clock.tick(60)
 
+    if dispatcher is not None:
+        dispatcher.close()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+import time
+import weakref
+import itertools
+import threading
+import collections
+
+from Observer_Pattern_scheduler import merge_changes
+
+# Asynchronous notification dispatch for the Observer_Pattern demo.
+# submit(observer, subject, changes) queues the notification and returns at
+# once; worker threads call observer.update(subject, changes) later, so a slow
+# observer no longer holds up notify() and the frame loop. Each observer is
+# always served by the same worker, from that worker's queue, so its
+# notifications are delivered in the order they were submitted. Observers
+# are assigned to the workers round-robin, on their first submit.
+# The queues are bounded. When a queue is full, the backpressure policy says
+# what happens:
+#   block        submit() waits until the worker makes room
+#   drop-oldest  the oldest queued notification of that worker is dropped
+#   coalesce     a notification for an (observer, subject) pair that is still
+#                queued absorbs the new changes (see merge_changes), so
+#                each pair has at most one queued notification; otherwise
+#                submit() waits like with block
+# stats() reports the queue depth, the dispatch latency (from submit to the
+# end of update) and the number of dropped and coalesced notifications.
+
+POLICIES = ("block", "drop-oldest", "coalesce")
+
+# multiplier of Fibonacci hashing, 2**64 / golden ratio
+_FIBONACCI_HASH = 11400714819323198485
+_MASK_64 = (1 << 64) - 1
+
+
+class _Notification:
+    __slots__ = ("observer", "subject", "changes", "queued_at")
+
+    def __init__(self, observer, subject, changes, queued_at):
+        self.observer = observer
+        self.subject = subject
+        self.changes = changes
+        self.queued_at = queued_at
+
+
+# None stands for "unknown changes" and absorbs everything
+def _merge(pending, changes):
+    if pending is None or changes is None:
+        return None
+    # a copy, the same changes may have been submitted to other observers
+    return merge_changes(dict(pending), changes)
+
+
+# the queue of one worker thread and its counters
+class _Shard:
+    def __init__(self, max_queue):
+        self.max_queue = max_queue
+        self.queue = collections.deque()
+        # (observer id, subject id) -> its queued notification, for coalesce
+        self.queued = {}
+        self.condition = threading.Condition()
+        self.busy = False
+        self.closed = False
+        self.submitted = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+
+class AsyncDispatcher:
+    def __init__(self, workers=2, max_queue=1024, policy="drop-oldest", clock=time.perf_counter):
+        if workers < 1:
+            raise ValueError("Invalid number of workers")
+        if max_queue < 1:
+            raise ValueError("Invalid queue size")
+        if policy not in POLICIES:
+            raise ValueError("Invalid backpressure policy")
+        self.policy = policy
+        self.clock = clock
+        # last exception raised by an observer, the workers keep running
+        self.last_error = None
+        self._shards = [_Shard(max_queue) for _ in range(workers)]
+        # observer -> index of its shard
+        self._assigned = weakref.WeakKeyDictionary()
+        self._next_shard = itertools.count()
+        self._assign_lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, args=(shard,), name=f"observer-dispatch-{i}", daemon=True)
+            for i, shard in enumerate(self._shards)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _shard(self, observer):
+        with self._assign_lock:
+            try:
+                index = self._assigned.get(observer)
+                if index is None:
+                    index = self._assigned[observer] = next(self._next_shard) % len(self._shards)
+            except TypeError:
+                # not weakly referenceable or not hashable: spread by address,
+                # mixed first as its low bits are the same for most objects
+                index = (id(observer) * _FIBONACCI_HASH & _MASK_64) >> 32
+                index %= len(self._shards)
+        return self._shards[index]
+
+    # number of observers assigned to each worker
+    def shard_sizes(self):
+        sizes = [0] * len(self._shards)
+        with self._assign_lock:
+            for index in self._assigned.values():
+                sizes[index] += 1
+        return sizes
+
+    # queue observer.update(subject, changes) on the observer's worker
+    def submit(self, observer, subject, changes=None):
+        shard = self._shard(observer)
+        key = (id(observer), id(subject))
+        with shard.condition:
+            if shard.closed:
+                raise ValueError("Dispatcher is closed")
+            shard.submitted += 1
+            if self.policy == "coalesce":
+                queued = shard.queued.get(key)
+                if queued is not None:
+                    queued.changes = _merge(queued.changes, changes)
+                    shard.coalesced += 1
+                    return
+            while len(shard.queue) >= shard.max_queue:
+                if self.policy == "drop-oldest":
+                    shard.queue.popleft()
+                    shard.dropped += 1
+                else:
+                    shard.condition.wait()
+                    if shard.closed:
+                        raise ValueError("Dispatcher is closed")
+            notification = _Notification(observer, subject, changes, self.clock())
+            shard.queue.append(notification)
+            if self.policy == "coalesce":
+                shard.queued[key] = notification
+            shard.max_depth = max(shard.max_depth, len(shard.queue))
+            shard.condition.notify_all()
+
+    def _run(self, shard):
+        while True:
+            with shard.condition:
+                while not shard.queue and not shard.closed:
+                    shard.condition.wait()
+                if not shard.queue:
+                    # closed and drained
+                    return
+                notification = shard.queue.popleft()
+                key = (id(notification.observer), id(notification.subject))
+                if shard.queued.get(key) is notification:
+                    del shard.queued[key]
+                shard.busy = True
+                # room for a blocked submit()
+                shard.condition.notify_all()
+
+            error = None
+            try:
+                notification.observer.update(notification.subject, notification.changes)
+            except Exception as exception:
+                error = exception
+            latency = self.clock() - notification.queued_at
+
+            with shard.condition:
+                shard.busy = False
+                if error is None:
+                    shard.delivered += 1
+                else:
+                    shard.errors += 1
+                    self.last_error = error
+                shard.latency_total += latency
+                shard.latency_max = max(shard.latency_max, latency)
+                shard.condition.notify_all()
+
+    # wait until every queued notification has been delivered
+    def wait_idle(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for shard in self._shards:
+            with shard.condition:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not shard.condition.wait_for(lambda: not shard.queue and not shard.busy, remaining):
+                    return False
+        return True
+
+    # stop accepting notifications; the workers deliver the queued ones and exit
+    def close(self, wait=True):
+        for shard in self._shards:
+            with shard.condition:
+                shard.closed = True
+                shard.condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # notifications waiting in the queues
+    def depth(self):
+        return sum(len(shard.queue) for shard in self._shards)
+
+    def stats(self):
+        totals = collections.Counter()
+        latency_max = 0.0
+        max_depth = 0
+        for shard in self._shards:
+            with shard.condition:
+                for name in ("submitted", "delivered", "dropped", "coalesced", "errors"):
+                    totals[name] += getattr(shard, name)
+                totals["latency_total"] += shard.latency_total
+                latency_max = max(latency_max, shard.latency_max)
+                max_depth = max(max_depth, shard.max_depth)
+        handled = totals["delivered"] + totals["errors"]
+        return {
+            "policy": self.policy,
+            "submitted": totals["submitted"],
+            "delivered": totals["delivered"],
+            "dropped": totals["dropped"],
+            "coalesced": totals["coalesced"],
+            "errors": totals["errors"],
+            "depth": self.depth(),
+            "max_depth": max_depth,
+            "latency_avg": totals["latency_total"] / handled if handled else 0.0,
+            "latency_max": latency_max,
+        }
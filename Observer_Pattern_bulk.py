@@ -0,0 +1,87 @@
+import pygame
+import numpy as np
+
+from batch_rasterizer import BatchRasterizer, RECTANGLE
+
+# Bulk observer for large numbers of rectangles in the Observer_Pattern demo.
+# Instead of one Rectangle observer per rectangle, a RectangleGroup keeps the
+# rectangles in NumPy columns and is attached to the subject as a single
+# observer: one update() recolors all of them with one vectorized call (the
+# same random colors Rectangle.update() picks one rectangle at a time), and
+# draw() draws them in batches with the BatchRasterizer (batch_rasterizer.py),
+# or with one pygame.draw.rect call each below its thresholds. update()
+# replaces the color column instead of writing into it, so draw() sees either
+# the old or the new colors when the group is notified from an
+# AsyncDispatcher worker.
+
+
+# clip pixels per rectangle from which the batch pays off: with 10x10
+# rectangles, measured at about 30,000 rectangles on an 800x600 screen
+PIXELS_PER_RECTANGLE = 16
+
+
+class RectangleGroup:
+    def __init__(self, capacity=1024, rng=None, rasterizer=None):
+        # a NumPy Generator or a seed
+        self.rng = np.random.default_rng(rng)
+        if rasterizer is None:
+            rasterizer = BatchRasterizer(pixels_per_shape=PIXELS_PER_RECTANGLE)
+        self.rasterizer = rasterizer
+        self._size = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = self.__dict__.get("x")
+        columns = {
+            "x": np.zeros(capacity, dtype=np.int32),
+            "y": np.zeros(capacity, dtype=np.int32),
+            "width": np.zeros(capacity, dtype=np.int32),
+            "height": np.zeros(capacity, dtype=np.int32),
+            "color": np.zeros((capacity, 3), dtype=np.uint8),
+        }
+        for name, column in columns.items():
+            if old is not None:
+                column[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, column)
+
+    @property
+    def capacity(self):
+        return len(self.x)
+
+    def __len__(self):
+        return self._size
+
+    # add rectangles with the given columns, returns the range of their rows
+    def add_many(self, x, y, width, height, color):
+        n = len(x)
+        start = self._size
+        if start + n > self.capacity:
+            self._allocate(max(start + n, 2 * self.capacity))
+        rows = slice(start, start + n)
+        self.x[rows] = x
+        self.y[rows] = y
+        self.width[rows] = width
+        self.height[rows] = height
+        self.color[rows] = color
+        self._size = start + n
+        return range(start, start + n)
+
+    def add(self, x, y, width, height, color):
+        return self.add_many([x], [y], [width], [height], [color])[0]
+
+    # Observer interface: a new random color for every rectangle
+    def update(self, subject, changes=None):
+        color = self.color.copy()
+        color[:self._size] = self.rng.integers(0, 256, (self._size, 3), dtype=np.uint8)
+        self.color = color
+
+    def draw(self, screen):
+        n = self._size
+        color = self.color
+        if not self.rasterizer.use_batch(screen, n):
+            for row in range(n):
+                rect = (self.x[row], self.y[row], self.width[row], self.height[row])
+                pygame.draw.rect(screen, color[row], rect)
+            return
+        kind = np.full(n, RECTANGLE, dtype=np.uint8)
+        self.rasterizer.draw_arrays(screen, kind, self.x[:n], self.y[:n], self.width[:n], self.height[:n], color[:n])
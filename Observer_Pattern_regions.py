@@ -0,0 +1,80 @@
+# Grid index of the regions of interest of the Observer_Pattern observers.
+# Regions are rectangles (x, y, width, height) stored under a handle in every
+# cell of a uniform grid they overlap, so finding the regions that intersect
+# the area of a change only looks at the cells that area covers, not at every
+# registered region.
+
+
+def intersects(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+# smallest rectangle containing both `a` and `b`
+def union_rects(a, b):
+    left = min(a[0], b[0])
+    top = min(a[1], b[1])
+    right = max(a[0] + a[2], b[0] + b[2])
+    bottom = max(a[1] + a[3], b[1] + b[3])
+    return (left, top, right - left, bottom - top)
+
+
+class RegionIndex:
+    def __init__(self, cell_size=64):
+        if cell_size <= 0:
+            raise ValueError("Invalid cell size")
+        self.cell_size = cell_size
+        # (column, row) -> handles of the regions overlapping that cell
+        self._cells = {}
+        # handle -> region
+        self._regions = {}
+
+    def _cells_of(self, rect):
+        x, y, width, height = rect
+        size = self.cell_size
+        for column in range(x // size, (x + width - 1) // size + 1):
+            for row in range(y // size, (y + height - 1) // size + 1):
+                yield column, row
+
+    def insert(self, handle, region):
+        region = tuple(region)
+        if region[2] <= 0 or region[3] <= 0:
+            raise ValueError("Invalid region")
+        if handle in self._regions:
+            self.remove(handle)
+        self._regions[handle] = region
+        for cell in self._cells_of(region):
+            self._cells.setdefault(cell, set()).add(handle)
+
+    def remove(self, handle):
+        region = self._regions.pop(handle, None)
+        if region is None:
+            return False
+        for cell in self._cells_of(region):
+            handles = self._cells[cell]
+            handles.discard(handle)
+            if not handles:
+                del self._cells[cell]
+        return True
+
+    # handles of the regions intersecting `area`
+    def query(self, area):
+        area = tuple(area)
+        found = set()
+        if area[2] <= 0 or area[3] <= 0:
+            return found
+        for cell in self._cells_of(area):
+            for handle in self._cells.get(cell, ()):
+                if handle not in found and intersects(self._regions[handle], area):
+                    found.add(handle)
+        return found
+
+    def handles(self):
+        return self._regions.keys()
+
+    def __len__(self):
+        return len(self._regions)
+
+    def __contains__(self, handle):
+        return handle in self._regions
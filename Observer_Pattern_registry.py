@@ -0,0 +1,103 @@
+import itertools
+import weakref
+
+from Observer_Pattern_regions import RegionIndex
+
+# Observer registry for the subjects of the Observer_Pattern demo.
+# Observers are held through weak references, so an observer that is attached
+# and then forgotten by the rest of the program is garbage collected instead
+# of being kept alive by the subject. attach() returns a handle and detach()
+# takes it: both are a single dict operation. Collected observers are not
+# removed right away; iterating over the registry (which is what notify()
+# does) skips them and prunes their entries afterwards. Observers are
+# iterated in the order they were attached.
+# An observer can subscribe to some event types only (topics) and to changes
+# within a region of interest (x, y, width, height); select() returns the
+# observers interested in an event, looking only at the subscribers of its
+# topics and, through a grid index, at the regions its area overlaps.
+
+
+class ObserverRegistry:
+    def __init__(self, cell_size=64):
+        # handle -> function returning the observer, or None once collected
+        self._refs = {}
+        self._handles = itertools.count(1)
+        self.cell_size = cell_size
+        # topic (None for every topic) -> handles of the observers without a region
+        self._anywhere = {}
+        # topic (None for every topic) -> RegionIndex of the observers with a region
+        self._regions = {}
+        # handle -> topics it subscribed to, for detach
+        self._topics = {}
+
+    # attach `observer` and return its handle; `weak=False` keeps the
+    # observer alive as long as it is attached. `topics` (a topic or a list
+    # of them) and `region` limit the events it is notified of.
+    def attach(self, observer, weak=True, topics=None, region=None):
+        handle = next(self._handles)
+        if isinstance(topics, str):
+            topics = (topics,)
+        topics = (None,) if topics is None else tuple(topics)
+        for topic in topics:
+            if region is None:
+                self._anywhere.setdefault(topic, {})[handle] = None
+            else:
+                self._regions.setdefault(topic, RegionIndex(self.cell_size)).insert(handle, region)
+        self._topics[handle] = topics
+        self._refs[handle] = weakref.ref(observer) if weak else (lambda: observer)
+        return handle
+
+    # detach the observer of `handle`, returns False if it was not attached
+    def detach(self, handle):
+        if self._refs.pop(handle, None) is None:
+            return False
+        for topic in self._topics.pop(handle):
+            anywhere = self._anywhere.get(topic, {})
+            if handle in anywhere:
+                del anywhere[handle]
+            else:
+                self._regions[topic].remove(handle)
+        return True
+
+    def __contains__(self, handle):
+        ref = self._refs.get(handle)
+        return ref is not None and ref() is not None
+
+    # live observers of the handles, in attachment order; collected ones are
+    # pruned once the iteration is done
+    def _observers(self, handles):
+        dead = []
+        for handle in handles:
+            ref = self._refs.get(handle)
+            observer = None if ref is None else ref()
+            if observer is None:
+                dead.append(handle)
+            else:
+                yield observer
+        for handle in dead:
+            self.detach(handle)
+
+    # the live observers
+    def __iter__(self):
+        # a copy, observers may attach or detach while being notified
+        return self._observers(list(self._refs))
+
+    # the observers interested in an event of any of `topics` (None for an
+    # event of no particular type) changing `area` (None for no particular place)
+    def select(self, topics=None, area=None):
+        if topics is None and area is None:
+            return iter(self)
+        if isinstance(topics, str):
+            topics = (topics,)
+        keys = set(self._anywhere) | set(self._regions) if topics is None else {None, *topics}
+        handles = set()
+        for key in keys:
+            handles.update(self._anywhere.get(key, ()))
+            regions = self._regions.get(key)
+            if regions is not None:
+                handles.update(regions.handles() if area is None else regions.query(area))
+        return self._observers(sorted(handles))
+
+    # number of live observers
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,145 @@
+import time
+import weakref
+
+from Observer_Pattern_regions import union_rects
+
+# Coalescing notification scheduler for the Observer_Pattern demo.
+# Instead of notifying its observers on every change, a subject reports the
+# change with changed(subject, {name: (old, new)}). The scheduler merges all
+# changes made since the last flush (keeping the first old value and the last
+# new value of every attribute), and flush(), called once per frame, notifies
+# every observer once with the merged diff as update(subject, changes).
+# Changes that cancel out are dropped, so an observer is not notified when the
+# circle is dragged away and back within one frame.
+# An observer can also be throttled to at most one notification every
+# `interval` seconds; the changes it misses meanwhile are merged into its
+# next notification.
+# The topic and area of the changes are merged too: a flush notifies the
+# observers subscribed to any of the topics and regions changed since the
+# last one (see Observer_Pattern_registry.py).
+# With an AsyncDispatcher (Observer_Pattern_async.py) the notifications are
+# queued to worker threads instead of being delivered during the flush.
+
+
+# merge `changes` into `pending`, both {name: (old, new)}
+def merge_changes(pending, changes):
+    for name, (old, new) in changes.items():
+        if name in pending:
+            old = pending[name][0]
+        pending[name] = (old, new)
+    return pending
+
+
+# topics and area of the pending changes of a subject, None for every topic
+# or every place
+class _Event:
+    def __init__(self, topic, area):
+        self.changes = {}
+        self.topics = None if topic is None else {topic}
+        self.area = area
+
+    def merge(self, changes, topic, area):
+        merge_changes(self.changes, changes)
+        if self.topics is not None:
+            if topic is None:
+                self.topics = None
+            else:
+                self.topics.add(topic)
+        if self.area is not None:
+            self.area = None if area is None else union_rects(self.area, area)
+
+
+# the changes whose value actually changed
+def effective_changes(changes):
+    return {name: (old, new) for name, (old, new) in changes.items() if old != new}
+
+
+class NotificationScheduler:
+    def __init__(self, interval=0.0, clock=time.monotonic, dispatcher=None):
+        # least seconds between two flushes that notify, 0 notifies every frame
+        self.interval = interval
+        self.clock = clock
+        self.dispatcher = dispatcher
+        # subject -> _Event merged from the changes since the last flush
+        self._events = {}
+        # throttled observer -> least seconds between its notifications
+        self._throttle = weakref.WeakKeyDictionary()
+        # throttled observer -> time of its last notification
+        self._last_sent = weakref.WeakKeyDictionary()
+        # throttled observer -> {subject: changes} not delivered yet
+        self._held = weakref.WeakKeyDictionary()
+        self._last_flush = None
+        self.changes_received = 0
+        self.notifications = 0
+
+    # record a change of `subject`, delivered on the next flush to the
+    # observers subscribed to `topic` and `area`
+    def changed(self, subject, changes, topic=None, area=None):
+        event = self._events.get(subject)
+        if event is None:
+            event = self._events[subject] = _Event(topic, area)
+        event.merge(changes, topic, area)
+        self.changes_received += 1
+
+    # notify `observer` at most once every `interval` seconds, 0 removes the limit
+    def throttle(self, observer, interval):
+        if interval < 0:
+            raise ValueError("Invalid interval")
+        if interval:
+            self._throttle[observer] = interval
+        else:
+            self._throttle.pop(observer, None)
+            self._last_sent.pop(observer, None)
+
+    def pending(self):
+        return bool(self._events) or len(self._held) > 0
+
+    def _send(self, observer, subject, changes):
+        if self.dispatcher is not None:
+            self.dispatcher.submit(observer, subject, changes)
+        else:
+            observer.update(subject, changes)
+        self.notifications += 1
+
+    # deliver the changes made since the last flush, returns the number of
+    # notifications sent
+    def flush(self, now=None):
+        now = self.clock() if now is None else now
+        if self._last_flush is not None and now - self._last_flush < self.interval:
+            return 0
+        self._last_flush = now
+        sent = self.notifications
+
+        events, self._events = self._events, {}
+        for subject, event in events.items():
+            diff = effective_changes(event.changes)
+            if not diff:
+                continue
+            for observer in list(subject.observers.select(event.topics, event.area)):
+                if observer in self._throttle:
+                    held = self._held.setdefault(observer, {})
+                    merge_changes(held.setdefault(subject, {}), diff)
+                else:
+                    self._send(observer, subject, diff)
+
+        # throttled observers whose interval is over get everything they missed
+        for observer in list(self._held.keys()):
+            last = self._last_sent.get(observer)
+            if last is not None and now - last < self._throttle.get(observer, 0):
+                continue
+            delivered = False
+            for subject, diff in self._held.pop(observer).items():
+                diff = effective_changes(diff)
+                if diff:
+                    self._send(observer, subject, diff)
+                    delivered = True
+            if delivered:
+                self._last_sent[observer] = now
+        return self.notifications - sent
+
+    def stats(self):
+        return {
+            "changes": self.changes_received,
+            "notifications": self.notifications,
+            "throttled": len(self._throttle),
+        }
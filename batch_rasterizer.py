@@ -0,0 +1,203 @@
+import pygame
+import numpy as np
+
+# Batched rasterizer for filled circles and rectangles, shared by the
+# Factory_Pattern demos and the bulk observers of the Observer_Pattern demo:
+# an alternative to calling Shape.draw() (one pygame.draw call) per shape.
+# Every shape is turned into horizontal pixel spans: a rectangle has one
+# span per row, a circle the spans of pygame's own filled circle of that
+# radius (sampled once per radius from pygame.draw.circle, so both paths
+# give the same pixels). The spans are expanded to pixels in a few large
+# groups, from the top shapes down, skipping spans already hidden by the
+# shapes above; the topmost shape of every pixel is found with
+# np.maximum.at on the drawing order, and the pixels are written in one
+# array assignment.
+# The batch has a fixed cost per pixel of the clip rectangle (the topmost
+# shape array) and a higher cost per shape pixel than pygame's fills, so it
+# only pays off for many shapes: measured with the demo's shapes (10 to 100
+# pixels wide), about 1,000 shapes in a 100x100 area and 9,000 on an 800x600
+# surface. Fewer shapes than min_batch, or than one per `pixels_per_shape`
+# pixels of the clip rectangle, and surfaces that are not 32 bits per pixel
+# fall back to Shape.draw().
+
+# shape kinds of the `kind` column
+CIRCLE = 1
+RECTANGLE = 2
+
+
+class BatchRasterizer:
+    def __init__(self, min_batch=1000, pixels_per_shape=50):
+        # fewer shapes than this are drawn with Shape.draw(), the batch setup
+        # would cost more than the calls it saves
+        self.min_batch = min_batch
+        # and fewer than one shape per this many pixels of the clip rectangle,
+        # None to batch regardless of the clip area
+        self.pixels_per_shape = pixels_per_shape
+        # radius -> (dy, x0, x1) spans of pygame's filled circle, relative to its center
+        self._circle_spans = {}
+
+    def circle_spans(self, radius):
+        spans = self._circle_spans.get(radius)
+        if spans is None:
+            spans = self._circle_spans[radius] = self._sample_circle(radius)
+        return spans
+
+    @staticmethod
+    def _sample_circle(radius):
+        center = radius + 2
+        size = 2 * center + 1
+        surface = pygame.Surface((size, size), depth=32)
+        pygame.draw.circle(surface, (255, 255, 255), (center, center), radius)
+        # rows of the circle (surfarray is indexed [x, y], rows are y)
+        rows = pygame.surfarray.array2d(surface).T != 0
+        padded = np.zeros((size, size + 2), dtype=np.int8)
+        padded[:, 1:-1] = rows
+        edges = np.diff(padded, axis=1)
+        ys, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        return ys - center, starts - center, ends - 1 - center
+
+    # spans of all shapes: y, x0, x1 (inclusive) and the shape they belong to
+    def _spans(self, kind, x, y, width, height):
+        order = np.arange(len(kind))
+        spans = []
+
+        rectangles = np.flatnonzero((kind == RECTANGLE) & (width > 0) & (height > 0))
+        if len(rectangles):
+            rows = height[rectangles]
+            shape = np.repeat(rectangles, rows)
+            first = np.cumsum(rows) - rows
+            dy = np.arange(len(shape)) - np.repeat(first, rows)
+            spans.append((y[shape] + dy, x[shape], x[shape] + width[shape] - 1, order[shape]))
+
+        circles = np.flatnonzero(kind == CIRCLE)
+        for radius in np.unique(width[circles]).tolist():
+            same_radius = circles[width[circles] == radius]
+            dy, dx0, dx1 = self.circle_spans(radius)
+            shape = np.repeat(same_radius, len(dy))
+            n = len(same_radius)
+            spans.append((y[shape] + np.tile(dy, n), x[shape] + np.tile(dx0, n),
+                          x[shape] + np.tile(dx1, n), order[shape]))
+
+        if not spans:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, empty
+        return tuple(np.concatenate(column) for column in zip(*spans))
+
+    # whether `n` shapes are drawn faster in a batch on `surface`
+    def use_batch(self, surface, n):
+        if surface.get_bytesize() != 4 or n == 0 or n < self.min_batch:
+            return False
+        if self.pixels_per_shape is None:
+            return True
+        clip = surface.get_clip()
+        return n * self.pixels_per_shape >= clip.width * clip.height
+
+    # colors as pixel values of a 32 bits per pixel surface
+    @staticmethod
+    def _map_colors(surface, color):
+        r_shift, g_shift, b_shift, _ = surface.get_shifts()
+        color = color.astype(np.uint32)
+        mapped = color[:, 0] << r_shift | color[:, 1] << g_shift | color[:, 2] << b_shift
+        # opaque on surfaces with per-pixel alpha, like surface.map_rgb()
+        return mapped | np.uint32(surface.get_masks()[3])
+
+    # spans of the shapes inside the clip rectangle, clipped to it
+    @staticmethod
+    def _clip_spans(spans, clip):
+        span_y, x0, x1, shape = spans
+        x0 = np.maximum(x0, clip.left)
+        x1 = np.minimum(x1, clip.right - 1)
+        visible = (span_y >= clip.top) & (span_y < clip.bottom) & (x0 <= x1)
+        return span_y[visible] - clip.top, x0[visible] - clip.left, x1[visible] - clip.left, shape[visible]
+
+    # groups of shapes from the top down, each covering about `target` pixels
+    @staticmethod
+    def _chunks(kind, width, height, target):
+        area = np.where(kind == CIRCLE, (2 * width + 1) ** 2, width * height)
+        group = (np.cumsum(area[::-1]) - 1) // max(target, 1)
+        stops = len(kind) - np.concatenate(([0], np.flatnonzero(np.diff(group)) + 1))
+        return zip(stops.tolist(), np.append(stops[1:], 0).tolist())
+
+    # draw shapes given as columns (see ShapeStore), later shapes on top;
+    # honours the clip rectangle of the surface like pygame.draw
+    def draw_arrays(self, surface, kind, x, y, width, height, color):
+        kind = np.asarray(kind)
+        x = np.asarray(x, dtype=np.int64)
+        y = np.asarray(y, dtype=np.int64)
+        width = np.asarray(width, dtype=np.int64)
+        height = np.asarray(height, dtype=np.int64)
+        color = np.asarray(color).reshape(-1, 3)
+
+        clip = surface.get_clip()
+        if clip.width <= 0 or clip.height <= 0 or len(kind) == 0:
+            return
+        # topmost shape of every pixel of the clip rectangle (row-major)
+        top = np.full(clip.width * clip.height, -1, dtype=np.int32)
+        # covered pixels counted along each row, to skip hidden spans
+        covered_before = None
+
+        # the shapes on top go first, so the spans of the shapes they hide are
+        # dropped before being expanded to pixels
+        for stop, start in self._chunks(kind, width, height, clip.width * clip.height):
+            rows = slice(start, stop)
+            span_y, x0, x1, shape = self._clip_spans(
+                self._spans(kind[rows], x[rows], y[rows], width[rows], height[rows]), clip)
+            shape += start
+            lengths = x1 - x0 + 1
+            if covered_before is not None:
+                hidden = covered_before[span_y, x1 + 1] - covered_before[span_y, x0] == lengths
+                span_y, x0, x1, shape, lengths = (column[~hidden] for column in (span_y, x0, x1, shape, lengths))
+            if len(shape) == 0:
+                continue
+
+            # expand the spans to pixels: the pixels of a span have consecutive indices
+            first = np.cumsum(lengths) - lengths
+            flat = np.arange(first[-1] + lengths[-1], dtype=np.int32)
+            flat += np.repeat((span_y * clip.width + x0 - first).astype(np.int32), lengths)
+            np.maximum.at(top, flat, np.repeat(shape.astype(np.int32), lengths))
+
+            if start > 0:
+                covered = (top >= 0).reshape(clip.height, clip.width)
+                if covered.all():
+                    break
+                covered_before = np.zeros((clip.height, clip.width + 1), dtype=np.int32)
+                np.cumsum(covered, axis=1, out=covered_before[:, 1:])
+
+        covered = np.flatnonzero(top >= 0)
+        pixels = pygame.surfarray.pixels2d(surface)
+        try:
+            pixels[clip.left + covered % clip.width, clip.top + covered // clip.width] = \
+                self._map_colors(surface, color)[top[covered]]
+        finally:
+            del pixels
+
+    # draw shape objects (Circle, Rectangle or store views) in the given order
+    def draw_shapes(self, surface, shapes):
+        shapes = list(shapes)
+        if not self.use_batch(surface, len(shapes)):
+            for shape in shapes:
+                shape.draw(surface)
+            return
+        kind = np.empty(len(shapes), dtype=np.uint8)
+        columns = np.empty((len(shapes), 4), dtype=np.int64)
+        color = np.empty((len(shapes), 3), dtype=np.uint8)
+        for i, shape in enumerate(shapes):
+            color[i] = shape.color
+            if hasattr(shape, "radius"):
+                kind[i] = CIRCLE
+                columns[i] = shape.x, shape.y, shape.radius, shape.radius
+            else:
+                kind[i] = RECTANGLE
+                columns[i] = shape.x, shape.y, shape.width, shape.height
+        self.draw_arrays(surface, kind, *columns.T, color)
+
+    # draw rows of a ShapeStore (all of them by default) without creating views
+    def draw_store(self, surface, store, rows=None):
+        rows = slice(0, len(store)) if rows is None else rows
+        if not self.use_batch(surface, len(store.kind[:len(store)][rows])):
+            for shape in store.views(range(len(store))[rows] if isinstance(rows, slice) else rows):
+                shape.draw(surface)
+            return
+        self.draw_arrays(surface, store.kind[rows], store.x[rows], store.y[rows],
+                         store.width[rows], store.height[rows], store.color[rows])
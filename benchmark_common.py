@@ -0,0 +1,35 @@
+import os
+import platform
+import tracemalloc
+
+# run headless: pygame's dummy video driver, no window is opened. Import this
+# module before pygame.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+# Helpers shared by the headless benchmarks (game_of_life_benchmark.py and
+# Factory_Pattern_benchmark.py).
+
+
+# peak memory allocated while running `function`
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def environment():
+    return {
+        "benchmark": "environment",
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from game_of_life_boards import (BOARD_TYPES, random_board, make_board, step_board, advance_board,
+                                 board_to_array, board_population, close_board)
+from game_of_life_snapshot import SnapshotWriter
+from game_of_life_patterns import load_pattern
+from game_of_life_rules import as_rule
+from game_of_life_cycles import CycleDetector
+
+# Headless batch runner for the Game of Life: no pygame, no display.
+# Runs N generations of a random board (or a pattern file) and prints statistics as JSON lines,
+# optionally saving board snapshots as .npy files or the whole run as a
+# history file (see game_of_life_snapshot.py). With --stop-on-cycle the run
+# ends as soon as the board becomes a still life or an oscillator.
+#
+#   python game_of_life_batch.py --size 2000 2000 --seed 1 --generations 1000 --stats-every 100
+
+
+# run a simulation, calling `report` with a statistics dict every `stats_every` generations
+def run_batch(n_cells_x, n_cells_y, generations, seed=None, density=0.2, board_type="dense",
+              workers=None, stats_every=0, snapshot_every=0, snapshot_dir=None, history=None,
+              history_every=1, pattern=None, stop_on_cycle=False, max_period=64, rule=None, report=None):
+    if pattern:
+        # start from the pattern file in the middle of an empty board,
+        # with the rule of the pattern file unless another one is given
+        loaded = load_pattern(pattern)
+        state = loaded.place_centered(np.zeros((n_cells_x, n_cells_y), dtype=np.int64))
+        if rule is None:
+            rule = loaded.rule
+        rule = as_rule(rule)
+        board = make_board(state, board_type, workers, rule)
+    else:
+        rule = as_rule(rule)
+        board = random_board(n_cells_x, n_cells_y, density, seed, board_type, workers, rule)
+    writer = SnapshotWriter(history, (n_cells_x, n_cells_y)) if history else None
+    detector = CycleDetector(board, max_period=max_period) if stop_on_cycle else None
+    started = time.perf_counter()
+
+    def stats(generation):
+        elapsed = time.perf_counter() - started
+        return {
+            "generation": generation,
+            "population": board_population(board),
+            "elapsed": round(elapsed, 6),
+            "generations_per_second": round(generation / elapsed, 3) if elapsed > 0 else None,
+        }
+
+    def snapshot(generation):
+        path = os.path.join(snapshot_dir, f"generation_{generation:08d}.npy")
+        np.save(path, board_to_array(board).astype(np.uint8))
+
+    if snapshot_every and snapshot_dir:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        snapshot(0)
+    if writer is not None:
+        writer.write(board_to_array(board), 0)
+    if stats_every and report:
+        report(stats(0))
+
+    try:
+        generation = 0
+        while generation < generations:
+            # run up to the next report/snapshot; HashLife jumps there in one go
+            stop = generations
+            for every in (stats_every, snapshot_every, history_every if writer is not None else 0):
+                if every:
+                    stop = min(stop, (generation // every + 1) * every)
+            if board_type == "hashlife" and detector is None:
+                board = advance_board(board, stop - generation, rule)
+                generation = stop
+            else:
+                while generation < stop:
+                    board = step_board(board, rule)
+                    generation += 1
+                    if detector is not None and detector.update(board):
+                        break
+
+            if stats_every and report and generation % stats_every == 0:
+                report(stats(generation))
+            if snapshot_every and snapshot_dir and generation % snapshot_every == 0:
+                snapshot(generation)
+            if writer is not None and history_every and generation % history_every == 0:
+                writer.write(board_to_array(board), generation)
+            if detector is not None and detector.period:
+                break
+
+        final = stats(generation)
+        if rule is not None:
+            final["rule"] = str(rule)
+        if detector is not None:
+            final["period"] = detector.period
+            final["cycle_start"] = detector.cycle_start
+        return final
+    finally:
+        close_board(board)
+        if writer is not None:
+            writer.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Game of Life without a display.")
+    parser.add_argument("--size", type=int, nargs=2, default=(40, 30), metavar=("CELLS_X", "CELLS_Y"),
+                        help="board size in cells (default: 40 30)")
+    parser.add_argument("--generations", type=int, default=100, help="generations to run (default: 100)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed of the initial board")
+    parser.add_argument("--density", type=float, default=0.2,
+                        help="fraction of live cells of the initial board (default: 0.2)")
+    parser.add_argument("--pattern", default=None,
+                        help="start from this RLE (.rle) or plaintext pattern file instead of a random board")
+    parser.add_argument("--rule", default=None,
+                        help="Life-like rule, e.g. B36/S23 (default: the pattern's rule, or B3/S23)")
+    parser.add_argument("--board", choices=["dense", *BOARD_TYPES], default="dense",
+                        help="board representation (default: dense)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for the parallel board (default: all cores)")
+    parser.add_argument("--stats-every", type=int, default=0,
+                        help="print statistics every N generations (0: only at the end)")
+    parser.add_argument("--snapshot-every", type=int, default=0,
+                        help="save a board snapshot every N generations (needs --snapshot-dir)")
+    parser.add_argument("--snapshot-dir", default=None, help="directory for the board snapshots")
+    parser.add_argument("--stop-on-cycle", action="store_true",
+                        help="stop once the board is a still life or repeats with a period <= --max-period")
+    parser.add_argument("--max-period", type=int, default=64,
+                        help="longest oscillator period detected by --stop-on-cycle (default: 64)")
+    parser.add_argument("--history", default=None, help="record the run to this history file")
+    parser.add_argument("--history-every", type=int, default=1,
+                        help="record every N-th generation to the history file (0: only the first; default: 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def report(stats):
+        print(json.dumps(stats), flush=True)
+
+    final = run_batch(*args.size, args.generations, seed=args.seed, density=args.density,
+                      board_type=args.board, workers=args.workers, stats_every=args.stats_every,
+                      snapshot_every=args.snapshot_every, snapshot_dir=args.snapshot_dir,
+                      history=args.history, history_every=args.history_every, pattern=args.pattern,
+                      stop_on_cycle=args.stop_on_cycle, max_period=args.max_period, rule=args.rule,
+                      report=report)
+    if not args.stats_every or final["generation"] % args.stats_every or "period" in final:
+        report(final)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
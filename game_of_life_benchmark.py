@@ -0,0 +1,279 @@
+import sys
+import json
+import time
+import argparse
+from contextlib import contextmanager
+
+# selects pygame's dummy video driver, so it is imported before pygame
+from benchmark_common import peak_memory, environment
+
+import numpy as np
+import pygame
+
+import game_of_life_game_1 as game
+from game_of_life_boards import random_state, random_board, step_board, board_population, close_board
+from game_of_life_renderer import BoardRenderer
+
+# Reproducible benchmarks of the Game of Life stepping engines and of the
+# drawing code, runnable without a display. Boards come from fixed seeds.
+# Every benchmark prints one JSON line (see --output to save them all as one
+# JSON document) with:
+#   steps:  generations_per_second, step time percentiles (ms), peak memory
+#   frames: frame time percentiles (ms), peak memory
+# --compare reports the benchmarks that got slower than a saved baseline.
+#
+#   python game_of_life_benchmark.py --sizes 40x30 1000x1000 --boards dense bitpacked --output bench.json
+#   python game_of_life_benchmark.py --compare bench.json
+
+DEFAULT_SIZES = ["40x30", "400x300", "1000x1000", "2000x2000", "10000x10000"]
+DEFAULT_RENDER_SIZES = ["40x30", "200x150", "800x600"]
+DEFAULT_BOARDS = ["dense", "bitpacked", "sparse"]
+PERCENTILES = (50, 90, 99)
+
+
+def _size(text):
+    try:
+        n_x, n_y = (int(n) for n in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid board size: {text} (expected e.g. 40x30)")
+    return n_x, n_y
+
+
+# enough generations to take a measurable time on small boards,
+# and only a few on the very large ones
+def _default_generations(n_cells_x, n_cells_y):
+    return max(3, min(500, 50_000_000 // (n_cells_x * n_cells_y)))
+
+
+def _timing_stats(times):
+    times_ms = np.asarray(times) * 1000
+    stats = {f"p{p}_ms": round(float(np.percentile(times_ms, p)), 4) for p in PERCENTILES}
+    stats["max_ms"] = round(float(times_ms.max()), 4)
+    stats["mean_ms"] = round(float(times_ms.mean()), 4)
+    return stats
+
+
+def bench_step(board_type, n_cells_x, n_cells_y, generations=None, seed=0, density=0.2,
+               workers=None, rule=None):
+    generations = generations or _default_generations(n_cells_x, n_cells_y)
+    # uint8 cells keep the 10k x 10k boards within memory, bit-packed
+    # boards are drawn without a dense board
+    def new_board():
+        return random_board(n_cells_x, n_cells_y, density, seed, board_type, workers, rule, dtype=np.uint8)
+
+    board = new_board()
+    try:
+        times = []
+        for _ in range(generations):
+            started = time.perf_counter()
+            board = step_board(board, rule)
+            times.append(time.perf_counter() - started)
+        population = board_population(board)
+    finally:
+        close_board(board)
+
+    # memory is measured on a separate short run, tracing slows the engines
+    # down; the board is created before, only its steps are measured
+    boards = [new_board()]
+
+    def short_run():
+        for _ in range(min(generations, 3)):
+            boards[0] = step_board(boards[0], rule)
+
+    try:
+        peak = peak_memory(short_run)
+    finally:
+        close_board(boards[0])
+
+    total = sum(times)
+    return {
+        "benchmark": "step",
+        "name": f"step/{board_type}/{n_cells_x}x{n_cells_y}",
+        "board": board_type,
+        "size": [n_cells_x, n_cells_y],
+        "generations": generations,
+        "seconds": round(total, 6),
+        "generations_per_second": round(generations / total, 3),
+        "cells_per_second": round(generations * n_cells_x * n_cells_y / total),
+        **_timing_stats(times),
+        "peak_memory_bytes": peak,
+        "final_population": population,
+    }
+
+
+# the module globals of the game for a board of another size
+@contextmanager
+def _game_settings(n_cells_x, n_cells_y, state, screen):
+    names = ("width", "height", "n_cells_x", "n_cells_y", "cell_width", "cell_height",
+             "button_x", "button_y", "game_state")
+    saved = {name: getattr(game, name) for name in names}
+    width, height = screen.get_size()
+    game.width, game.height = width, height
+    game.n_cells_x, game.n_cells_y = n_cells_x, n_cells_y
+    game.cell_width, game.cell_height = width // n_cells_x, height // n_cells_y
+    game.button_x = (width - game.button_width) // 2
+    game.button_y = height - game.button_height - 10
+    game.game_state = state
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(game, name, value)
+
+
+def bench_frames(name, n_cells_x, n_cells_y, draw, frames, setup=None):
+    times = []
+    for frame in range(frames):
+        if setup is not None:
+            setup(frame)
+        started = time.perf_counter()
+        draw()
+        times.append(time.perf_counter() - started)
+
+    def short_run():
+        for frame in range(min(frames, 3)):
+            if setup is not None:
+                setup(frame)
+            draw()
+
+    return {
+        "benchmark": "frame",
+        "name": f"frame/{name}/{n_cells_x}x{n_cells_y}",
+        "size": [n_cells_x, n_cells_y],
+        "frames": frames,
+        **_timing_stats(times),
+        "peak_memory_bytes": peak,
+    }
+
+
+# the original draw functions of the game and the cached renderer
+def bench_render(n_cells_x, n_cells_y, frames=None, seed=0, density=0.2):
+    # cells of at least one pixel in a window of the game's size
+    cell = min(game.width // n_cells_x, game.height // n_cells_y)
+    if cell < 1:
+        raise ValueError(f"Invalid render size: {n_cells_x}x{n_cells_y} does not fit a {game.width}x{game.height} window")
+    frames = frames or max(5, min(200, 200_000 // (n_cells_x * n_cells_y)))
+    screen = pygame.display.set_mode((n_cells_x * cell, n_cells_y * cell))
+
+    # a new generation every frame, stepped outside of the timings
+    states = [random_state(n_cells_x, n_cells_y, density, seed)]
+    for _ in range(frames):
+        states.append(step_board(states[-1]))
+
+    results = []
+    with _game_settings(n_cells_x, n_cells_y, states[0], screen):
+        results.append(bench_frames("draw_grid", n_cells_x, n_cells_y, lambda: game.draw_grid(screen), frames))
+        results.append(bench_frames("draw_button", n_cells_x, n_cells_y, lambda: game.draw_button(screen), frames))
+
+        def next_state(frame):
+            game.game_state = states[frame + 1]
+
+        results.append(bench_frames("draw_cells", n_cells_x, n_cells_y, lambda: game.draw_cells(screen),
+                                    frames, next_state))
+
+        renderer = BoardRenderer(screen, n_cells_x, n_cells_y, cell, cell,
+                                 (game.button_x, game.button_y, game.button_width, game.button_height),
+                                 background=game.white, grid_color=game.gray, cell_color=game.black,
+                                 button_color=game.green)
+        results.append(bench_frames("renderer_full", n_cells_x, n_cells_y,
+                                    lambda: renderer.draw(states[0]), frames, lambda frame: renderer.invalidate()))
+        renderer.draw(states[0])
+        results.append(bench_frames("renderer_incremental", n_cells_x, n_cells_y,
+                                    lambda: renderer.draw(game.game_state), frames, next_state))
+    return results
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, boards=DEFAULT_BOARDS, render_sizes=DEFAULT_RENDER_SIZES,
+                   generations=None, frames=None, seed=0, density=0.2, workers=None, rule=None, report=None):
+    results = [environment()]
+    if report:
+        report(results[-1])
+
+    def add(result):
+        results.append(result)
+        if report:
+            report(result)
+
+    for n_cells_x, n_cells_y in sizes:
+        for board_type in boards:
+            add(bench_step(board_type, n_cells_x, n_cells_y, generations, seed, density, workers, rule))
+
+    if render_sizes:
+        pygame.init()
+        try:
+            for n_cells_x, n_cells_y in render_sizes:
+                for result in bench_render(n_cells_x, n_cells_y, frames, seed, density):
+                    add(result)
+        finally:
+            pygame.quit()
+    return results
+
+
+# benchmarks slower than the baseline by more than `tolerance` (a fraction)
+def compare(results, baseline, tolerance=0.1):
+    def key(result):
+        return result.get("name"), result.get("generations", result.get("frames"))
+
+    baseline = {key(result): result for result in baseline if "name" in result}
+    regressions = []
+    for result in results:
+        before = baseline.get(key(result))
+        if before is None:
+            continue
+        if before["p50_ms"] and result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append({
+                "benchmark": "regression",
+                "name": result["name"],
+                "baseline_p50_ms": before["p50_ms"],
+                "p50_ms": result["p50_ms"],
+                "slowdown": round(result["p50_ms"] / before["p50_ms"], 3),
+            })
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Game of Life engines and drawing code headlessly.")
+    parser.add_argument("--sizes", type=_size, nargs="*", default=[_size(s) for s in DEFAULT_SIZES],
+                        metavar="XxY", help="board sizes of the step benchmarks (default: 40x30 up to 10000x10000)")
+    parser.add_argument("--boards", nargs="*", default=DEFAULT_BOARDS,
+                        help="board types of the step benchmarks (default: dense bitpacked sparse)")
+    parser.add_argument("--render-sizes", type=_size, nargs="*", default=[_size(s) for s in DEFAULT_RENDER_SIZES],
+                        metavar="XxY", help="board sizes of the drawing benchmarks (default: 40x30 200x150 800x600)")
+    parser.add_argument("--generations", type=int, default=None,
+                        help="generations per step benchmark (default: scaled to the board size)")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="frames per drawing benchmark (default: scaled to the board size)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the boards (default: 0)")
+    parser.add_argument("--density", type=float, default=0.2,
+                        help="fraction of live cells of the boards (default: 0.2)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for the parallel board")
+    parser.add_argument("--rule", default=None, help="Life-like rule, e.g. B36/S23 (default: B3/S23)")
+    parser.add_argument("--output", default=None, help="also save all results to this JSON file")
+    parser.add_argument("--compare", default=None, help="report benchmarks slower than this saved JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="allowed median slowdown for --compare, as a fraction (default: 0.1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def report(result):
+        print(json.dumps(result), flush=True)
+
+    results = run_benchmarks(args.sizes, args.boards, args.render_sizes, args.generations, args.frames,
+                             args.seed, args.density, args.workers, args.rule, report)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            report(regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
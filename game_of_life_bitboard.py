@@ -0,0 +1,215 @@
+import numpy as np
+
+# Bit-packed Game of Life board: 64 cells per uint64 word.
+# Cells are addressed as board[x, y] like the dense game_state array;
+# every x column of the board is packed along y into words, so cell (x, y)
+# lives in bit (y % 64) of word (y // 64) of row x.
+
+WORD_BITS = 64
+_ONE = np.uint64(1)
+# number of set bits of every byte value, for NumPy without np.bitwise_count
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+# rows of words stepped together, see BitBoard.step()
+BAND_BYTES = 1 << 20
+
+
+class BitBoard:
+    def __init__(self, n_cells_x, n_cells_y, rule=None):
+        self.n_cells_x = n_cells_x
+        self.n_cells_y = n_cells_y
+        self.rule = rule
+        self.n_words = (n_cells_y + WORD_BITS - 1) // WORD_BITS
+        self.words = np.zeros((n_cells_x, self.n_words), dtype=np.uint64)
+
+        # mask of the valid bits in the last word of each row
+        tail = n_cells_y - (self.n_words - 1) * WORD_BITS
+        self._tail_mask = np.uint64((1 << tail) - 1) if tail < WORD_BITS else ~np.uint64(0)
+        self._last_bit = np.uint64(tail - 1)
+
+    @property
+    def shape(self):
+        return self.n_cells_x, self.n_cells_y
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+    # rows of words handled together by step() and the other band loops
+    def _band_rows(self):
+        return max(1, BAND_BYTES // max(1, self.n_words * 8))
+
+    # pack rows of 0/1 cells (indexed [x, y]) into words
+    def _pack_rows(self, cells):
+        bits = np.packbits(cells, axis=1, bitorder="little")
+        pad = self.n_words * 8 - bits.shape[1]
+        if pad:
+            bits = np.pad(bits, ((0, 0), (0, pad)))
+        return bits.view("<u8")
+
+    # create a packed board from a dense 0/1 array indexed [x, y]
+    @classmethod
+    def from_array(cls, state, rule=None):
+        board = cls(*state.shape, rule=rule)
+        board.words[:] = board._pack_rows(state.astype(bool, copy=False))
+        return board
+
+    # random board with the given fraction of live cells: the same cells as
+    # random_state() of game_of_life_boards.py for the same seed, but drawn
+    # and packed in bands of rows, so no dense board is ever built
+    @classmethod
+    def random(cls, n_cells_x, n_cells_y, density=0.2, seed=None, rule=None):
+        board = cls(n_cells_x, n_cells_y, rule=rule)
+        rng = np.random.default_rng(seed)
+        # rng.choice([0, 1], p=[1 - density, density]) picks 1 for the
+        # uniform samples at or above this
+        cdf = np.cumsum([1 - density, density])
+        threshold = cdf[0] / cdf[-1]
+        # about BAND_BYTES of float64 samples per band
+        rows = max(1, BAND_BYTES // (8 * max(1, n_cells_y)))
+        for start in range(0, n_cells_x, rows):
+            stop = min(start + rows, n_cells_x)
+            board.words[start:stop] = board._pack_rows(rng.random((stop - start, n_cells_y)) >= threshold)
+        return board
+
+    # unpack the board to a dense 0/1 array indexed [x, y]
+    def to_array(self, dtype=np.int64):
+        bits = np.unpackbits(self.words.astype("<u8", copy=False).view(np.uint8),
+                             axis=1, count=self.n_cells_y, bitorder="little")
+        return bits.astype(dtype, copy=False)
+
+    def __getitem__(self, pos):
+        x, y = pos
+        word, bit = divmod(y, WORD_BITS)
+        return int((self.words[x, word] >> np.uint64(bit)) & _ONE)
+
+    def __setitem__(self, pos, value):
+        x, y = pos
+        word, bit = divmod(y, WORD_BITS)
+        mask = _ONE << np.uint64(bit)
+        if value:
+            self.words[x, word] |= mask
+        else:
+            self.words[x, word] &= ~mask
+
+    def toggle(self, x, y):
+        word, bit = divmod(y, WORD_BITS)
+        self.words[x, word] ^= _ONE << np.uint64(bit)
+
+    # set many cells alive at once (coordinate arrays)
+    def set_cells(self, xs, ys):
+        words, bits = np.divmod(np.asarray(ys), WORD_BITS)
+        np.bitwise_or.at(self.words, (np.asarray(xs), words), _ONE << bits.astype(np.uint64))
+
+    # counted in bands of rows: the per-byte counts of the whole board at
+    # once would take as much memory as the board itself
+    def population(self):
+        total = 0
+        rows = self._band_rows()
+        for start in range(0, self.n_cells_x, rows):
+            words = self.words[start:start + rows]
+            if hasattr(np, "bitwise_count"):
+                counts = np.bitwise_count(words)
+            else:
+                counts = _POPCOUNT[words.view(np.uint8)]
+            total += int(counts.sum(dtype=np.int64))
+        return total
+
+    # rows shifted so that each cell holds its neighbour at y + 1 (wraps around)
+    def _shift_up(self, words):
+        shifted = (words >> _ONE) | (np.roll(words, -1, axis=1) << np.uint64(63))
+        # the last valid cell wraps around to cell 0
+        last = shifted[:, -1] & ~(_ONE << self._last_bit)
+        shifted[:, -1] = last | ((words[:, 0] & _ONE) << self._last_bit)
+        shifted[:, -1] &= self._tail_mask
+        return shifted
+
+    # rows shifted so that each cell holds its neighbour at y - 1 (wraps around)
+    def _shift_down(self, words):
+        shifted = (words << _ONE) | (np.roll(words, 1, axis=1) >> np.uint64(63))
+        # cell 0 wraps around to the last valid cell
+        first = shifted[:, 0] & ~_ONE
+        shifted[:, 0] = first | ((words[:, -1] >> self._last_bit) & _ONE)
+        shifted[:, -1] &= self._tail_mask
+        return shifted
+
+    # the 8 neighbour bit-planes of the rows of a band, as views: `block`
+    # holds the band with one extra row above and below, `up` and `down` are
+    # its shifted copies; the 2 side cells of row x, and the 3 cells of rows
+    # x-1 and x+1
+    @staticmethod
+    def _neighbor_planes(block, up, down):
+        yield up[1:-1]
+        yield down[1:-1]
+        for rows in (slice(None, -2), slice(2, None)):
+            yield block[rows]
+            yield up[rows]
+            yield down[rows]
+
+    # any Life-like rule: a 4-bit counter per cell, then the birth and
+    # survival counts of the rule are matched bit-plane by bit-plane
+    def _step_rule(self, words, planes):
+        counter = [np.zeros_like(words) for _ in range(4)]
+        for plane in planes:
+            carry = plane
+            for bit in counter:
+                next_carry = bit & carry
+                bit ^= carry
+                carry = next_carry
+
+        born = np.zeros_like(words)
+        survive = np.zeros_like(words)
+        for count in self.rule.birth | self.rule.survival:
+            match = ~np.zeros_like(words)
+            for i, bit in enumerate(counter):
+                match &= bit if count >> i & 1 else ~bit
+            if count in self.rule.birth:
+                born |= match
+            if count in self.rule.survival:
+                survive |= match
+
+        new_words = (born & ~words) | (survive & words)
+        new_words[:, -1] &= self._tail_mask
+        return new_words
+
+    # Conway's rule with a bit-sliced counter: the 8 neighbour planes are
+    # added with ripple-carry adders, keeping 3 bits of the count per cell
+    # (8 wraps to 0, fine)
+    @staticmethod
+    def _step_conway(words, planes):
+        s0 = np.zeros_like(words)
+        s1 = np.zeros_like(words)
+        s2 = np.zeros_like(words)
+        for plane in planes:
+            carry = s0 & plane
+            s0 ^= plane
+            carry2 = s1 & carry
+            s1 ^= carry
+            s2 ^= carry2
+        # alive next if count is 3, or count is 2 and the cell is alive
+        return s1 & ~s2 & (s0 | words)
+
+    # advance the board by one generation; the rows are stepped in bands of
+    # about BAND_BYTES, so besides the old and the new words the step only
+    # needs about ten band-sized temporaries: the peak memory is twice the
+    # packed board plus ~10 * BAND_BYTES (18 MB for an 8 MB board of 8192^2
+    # cells) instead of ~10 times the board
+    def step(self):
+        words = self.words
+        n_rows = self.n_cells_x
+        band = self._band_rows()
+        conway = self.rule is None or self.rule.is_conway
+        new_words = np.empty_like(words)
+
+        for start in range(0, n_rows, band):
+            stop = min(start + band, n_rows)
+            # the band and its neighbour rows, wrapping around the board
+            block = words.take(range(start - 1, stop + 1), axis=0, mode="wrap")
+            planes = self._neighbor_planes(block, self._shift_up(block), self._shift_down(block))
+            center = block[1:-1]
+            if conway:
+                new_words[start:stop] = self._step_conway(center, planes)
+            else:
+                new_words[start:stop] = self._step_rule(center, planes)
+
+        self.words = new_words
+        return self
@@ -0,0 +1,106 @@
+import numpy as np
+
+from game_of_life_engine import step
+from game_of_life_bitboard import BitBoard
+from game_of_life_hashlife import HashLife
+from game_of_life_sparse import SparseLife
+from game_of_life_parallel import ParallelLife
+from game_of_life_rules import as_rule
+
+# Helpers to create and drive any of the Game of Life board types,
+# shared by the pygame game and the headless batch runner.
+#   "dense"     - numpy array indexed [x, y] (game_state of the original game)
+#   "bitpacked" - 64 cells per machine word
+#   "sparse"    - only recomputes regions that changed last generation
+#   "parallel"  - bands stepped by a pool of worker processes
+#   "hashlife"  - memoized quadtree, fast for long runs of regular or settled
+#                 boards, slow on chaotic ones (see game_of_life_hashlife.py)
+# Every board type runs any Life-like rule ("B36/S23", a Rule, None for
+# Conway's Game of Life); boards other than dense keep their rule, a dense
+# board is passed its rule on every step.
+
+BOARD_TYPES = {
+    "bitpacked": BitBoard,
+    "sparse": SparseLife,
+    "parallel": ParallelLife,
+    "hashlife": HashLife,
+}
+
+
+# random 0/1 board with the given fraction of live cells
+def random_state(n_cells_x, n_cells_y, density=0.2, seed=None):
+    rng = np.random.default_rng(seed)
+    return rng.choice([0, 1], size=(n_cells_x, n_cells_y), p=[1 - density, density])
+
+
+# random board of the requested type; the same cells as
+# make_board(random_state(...)) for the same seed, but a bit-packed board is
+# drawn in packed bands without building the dense board first
+def random_board(n_cells_x, n_cells_y, density=0.2, seed=None, board_type="dense", workers=None, rule=None,
+                 dtype=np.int64):
+    if board_type == "bitpacked":
+        return BitBoard.random(n_cells_x, n_cells_y, density, seed, rule=as_rule(rule))
+    state = random_state(n_cells_x, n_cells_y, density, seed).astype(dtype, copy=False)
+    return make_board(state, board_type, workers, rule)
+
+
+# wrap a dense state into the requested board type
+def make_board(state, board_type="dense", workers=None, rule=None):
+    rule = as_rule(rule)
+    if board_type == "dense":
+        return state
+    if board_type not in BOARD_TYPES:
+        raise ValueError(f"Invalid board type: {board_type}")
+    if board_type == "parallel":
+        return ParallelLife.from_array(state, workers=workers, rule=rule)
+    return BOARD_TYPES[board_type].from_array(state, rule=rule)
+
+
+# advance a board by one generation, returns the board to use from now on
+def step_board(board, rule=None):
+    if isinstance(board, np.ndarray):
+        return step(board, as_rule(rule))
+    return board.step()
+
+
+# advance a board by n generations at once with HashLife
+def advance_board(board, n, rule=None):
+    if isinstance(board, np.ndarray):
+        return HashLife(board, rule=as_rule(rule)).advance(n).to_array()
+    if isinstance(board, HashLife):
+        return board.advance(n)
+    engine = HashLife(board.to_array(), rule=board.rule).advance(n)
+    if isinstance(board, ParallelLife):
+        # keep the worker pool, just load the new board into its buffer
+        board.state[:] = engine.to_array()
+        return board
+    return type(board).from_array(engine.to_array(), rule=board.rule)
+
+
+def board_to_array(board):
+    if isinstance(board, np.ndarray):
+        return board
+    return board.to_array()
+
+
+def board_population(board):
+    if isinstance(board, np.ndarray):
+        return int(board.sum(dtype=np.int64))
+    return board.population()
+
+
+# set cells alive on any board type (coordinate arrays, wrapped around the board)
+def place_cells(board, xs, ys):
+    n_x, n_y = board.shape
+    xs, ys = np.asarray(xs) % n_x, np.asarray(ys) % n_y
+    if isinstance(board, np.ndarray):
+        board[xs, ys] = 1
+    else:
+        board.set_cells(xs, ys)
+    return board
+
+
+# release the resources held by a board (worker processes, shared memory)
+def close_board(board):
+    if isinstance(board, ParallelLife):
+        board.close()
@@ -0,0 +1,117 @@
+from collections import deque
+
+import numpy as np
+
+# Still life and oscillator detection for Game of Life runs.
+# The board is hashed as 64-cell words: the hash is the XOR of a mixed
+# (splitmix64) value of every word and its position, so after a step only
+# the words that changed are mixed again. Finding them still takes one pass
+# over the board: update() compares every word with the previous generation
+# (bit-packed boards are compared straight from their words, other boards are
+# packed first), so its cost is O(board), about a sixth of a dense step on a
+# chaotic board. A stepper that knows which words changed can pass them to
+# update(), which then only looks at those words (for BitBoards and dense
+# arrays). The detector keeps the words array of a BitBoard instead of a
+# copy, so a BitBoard must not be edited in place (toggle, set_cells) between
+# two updates.
+# A bounded history of recent hashes finds boards that repeat: period 1 is
+# a still life (or an empty board), period N an oscillator (or a spaceship
+# that wrapped around the board). Hash collisions are possible in theory
+# but negligible with 64-bit hashes.
+
+
+# splitmix64 of each word combined with its position
+def _mix(words, positions, seed):
+    z = words ^ (positions.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) + np.uint64(seed))
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _xor_mixed(words, positions, seed):
+    if len(positions) == 0:
+        return np.uint64(0)
+    return np.bitwise_xor.reduce(_mix(words, positions, seed))
+
+
+# the board as a flat array of 64-cell words; the words of a BitBoard are
+# not copied, BitBoard.step() makes a new array every generation
+def _board_words(board):
+    if hasattr(board, "words"):
+        return board.words.reshape(-1)
+    state = board if isinstance(board, np.ndarray) else board.to_array()
+    packed = np.packbits(state.ravel() != 0, bitorder="little")
+    padded = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+    padded[:len(packed)] = packed
+    return padded.view("<u8")
+
+
+# the words at flat indices `positions` of a dense board, packed like _board_words
+def _dense_words(state, positions):
+    cells = state.ravel()
+    offsets = positions[:, None] * 64 + np.arange(64)
+    bits = cells[np.minimum(offsets, len(cells) - 1)] != 0
+    bits &= offsets < len(cells)
+    return np.packbits(bits, axis=1, bitorder="little").view("<u8").ravel()
+
+
+class CycleDetector:
+    def __init__(self, board, max_period=64, seed=0):
+        self.max_period = max_period
+        self.seed = seed
+        self.generation = 0
+        # set once the board repeats
+        self.period = None
+        self.cycle_start = None
+
+        self._words = _board_words(board)
+        # whether _words is the array of a BitBoard, which must not be written
+        self._shared = hasattr(board, "words")
+        self.hash = _xor_mixed(self._words, np.arange(len(self._words)), seed)
+        self._history = deque([(self.hash, 0)], maxlen=max_period)
+        self._seen = {self.hash: 0}
+
+    # feed the board of the next generation (any board type), returns the
+    # period once the board repeats. `changed`: flat indices (or a boolean
+    # mask) of the only words that may have changed, if the stepper knows them
+    def update(self, board, changed=None):
+        if changed is None:
+            words = _board_words(board)
+            changed = np.flatnonzero(words != self._words)
+            old, new = self._words[changed], words[changed]
+            self._words = words
+        else:
+            changed = np.asarray(changed)
+            changed = np.flatnonzero(changed) if changed.dtype == bool else changed.astype(np.intp).ravel()
+            old = self._words[changed]
+            if hasattr(board, "words"):
+                self._words = board.words.reshape(-1)
+                new = self._words[changed]
+            else:
+                state = board if isinstance(board, np.ndarray) else board.to_array()
+                new = _dense_words(state, changed)
+                if self._shared:
+                    self._words = self._words.copy()
+                self._words[changed] = new
+        self._shared = hasattr(board, "words")
+        self.hash ^= _xor_mixed(old, changed, self.seed)
+        self.hash ^= _xor_mixed(new, changed, self.seed)
+        self.generation += 1
+
+        seen_at = self._seen.get(self.hash)
+        if seen_at is not None and self.period is None:
+            self.period = self.generation - seen_at
+            self.cycle_start = seen_at
+
+        # forget hashes older than max_period generations
+        if len(self._history) == self._history.maxlen:
+            old_hash, old_generation = self._history[0]
+            if self._seen.get(old_hash) == old_generation:
+                del self._seen[old_hash]
+        self._history.append((self.hash, self.generation))
+        self._seen[self.hash] = self.generation
+        return self.period
+
+    @property
+    def is_still_life(self):
+        return self.period == 1
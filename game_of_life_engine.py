@@ -0,0 +1,57 @@
+import numpy as np
+
+# Vectorized stepping engine for the Game of Life.
+# The board is indexed as state[x, y] (same layout as game_state in
+# game_of_life_game_1.py) and wraps around on both axes (toroidal board).
+
+
+# count the 8 neighbours of every cell in one go
+def count_neighbors(state):
+    # pad the board with one wrapped-around cell on each side, so the
+    # neighbour sums become plain slices instead of modulo lookups
+    padded = np.pad(state.astype(np.uint8, copy=False), 1, mode="wrap")
+    n_x, n_y = state.shape
+
+    neighbors = np.zeros((n_x, n_y), dtype=np.uint8)
+    for dx in (0, 1, 2):
+        for dy in (0, 1, 2):
+            if dx == 1 and dy == 1:
+                continue
+            neighbors += padded[dx:dx + n_x, dy:dy + n_y]
+    return neighbors
+
+
+# compute the next generation, returns a new array of the same shape/dtype;
+# `rule` is a Rule from game_of_life_rules.py, None is Conway's Game of Life
+def step(state, rule=None):
+    neighbors = count_neighbors(state)
+    if rule is not None:
+        return rule.apply(state, neighbors).astype(state.dtype)
+    # a cell is alive next generation if it has 3 neighbours,
+    # or if it is alive now and has 2 neighbours
+    alive = (neighbors == 3) | ((state == 1) & (neighbors == 2))
+    return alive.astype(state.dtype)
+
+
+# reference implementation: the original per-cell loop (slow, kept for checks)
+def step_reference(state):
+    n_cells_x, n_cells_y = state.shape
+    new_state = np.copy(state)
+
+    for y in range(n_cells_y):
+        for x in range(n_cells_x):
+            n_neighbors = state[(x - 1) % n_cells_x, (y - 1) % n_cells_y] + \
+                          state[(x)     % n_cells_x, (y - 1) % n_cells_y] + \
+                          state[(x + 1) % n_cells_x, (y - 1) % n_cells_y] + \
+                          state[(x - 1) % n_cells_x, (y)     % n_cells_y] + \
+                          state[(x + 1) % n_cells_x, (y)     % n_cells_y] + \
+                          state[(x - 1) % n_cells_x, (y + 1) % n_cells_y] + \
+                          state[(x)     % n_cells_x, (y + 1) % n_cells_y] + \
+                          state[(x + 1) % n_cells_x, (y + 1) % n_cells_y]
+
+            if state[x, y] == 1 and (n_neighbors < 2 or n_neighbors > 3):
+                new_state[x, y] = 0
+            elif state[x, y] == 0 and n_neighbors == 3:
+                new_state[x, y] = 1
+
+    return new_state
@@ -0,0 +1,147 @@
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from game_of_life_rules import as_rule
+
+# Ensemble stepping: many small independent Game of Life boards stacked into
+# one 3-D array states[board, x, y] and stepped together with a single
+# vectorized call, for parameter studies over seeds, densities and rules.
+# Every board wraps around on its own (toroidal), like the dense engine.
+#
+#   python game_of_life_ensemble.py --boards 5000 --size 40 30 --density 0.1 0.5 --generations 200
+
+
+# random boards, `density` is one fraction of live cells or one per board
+def random_ensemble(n_boards, n_cells_x, n_cells_y, density=0.2, seed=None):
+    rng = np.random.default_rng(seed)
+    densities = np.broadcast_to(np.asarray(density, dtype=np.float64), (n_boards,))
+    return (rng.random((n_boards, n_cells_x, n_cells_y)) < densities[:, None, None]).astype(np.uint8)
+
+
+# count the 8 neighbours of every cell of every board
+def count_neighbors_ensemble(states):
+    # wrap each board on its own: pad the x and y axes only
+    padded = np.pad(states.astype(np.uint8, copy=False), ((0, 0), (1, 1), (1, 1)), mode="wrap")
+    _, n_x, n_y = states.shape
+
+    neighbors = np.zeros(states.shape, dtype=np.uint8)
+    for dx in (0, 1, 2):
+        for dy in (0, 1, 2):
+            if dx == 1 and dy == 1:
+                continue
+            neighbors += padded[:, dx:dx + n_x, dy:dy + n_y]
+    return neighbors
+
+
+# rule lookup tables: one (2, 9) table shared by every board, or one per board
+def _rule_tables(rules, n_boards):
+    if rules is None or isinstance(rules, str) or hasattr(rules, "table"):
+        rule = as_rule(rules)
+        return None if rule is None else rule.table
+    rules = [as_rule(rule) for rule in rules]
+    if len(rules) != n_boards:
+        raise ValueError(f"Invalid number of rules: {len(rules)} for {n_boards} boards")
+    return np.stack([rule.table for rule in rules])
+
+
+# advance every board by one generation; `tables` from _rule_tables()
+def step_ensemble(states, tables=None):
+    neighbors = count_neighbors_ensemble(states)
+    if tables is None:
+        alive = (neighbors == 3) | ((states == 1) & (neighbors == 2))
+        return alive.astype(np.uint8)
+    if tables.ndim == 2:
+        return tables[states, neighbors]
+    boards = np.arange(len(states))[:, None, None]
+    return tables[boards, states, neighbors]
+
+
+class Ensemble:
+    # `rules`: None (Conway), one rule for every board, or a list of rules, one per board
+    def __init__(self, states, rules=None):
+        self.states = np.array(states, dtype=np.uint8)
+        if self.states.ndim != 3:
+            raise ValueError("Invalid ensemble: expected an array of shape (boards, cells_x, cells_y)")
+        self.tables = _rule_tables(rules, len(self.states))
+        self.generation = 0
+
+    @classmethod
+    def random(cls, n_boards, n_cells_x, n_cells_y, density=0.2, seed=None, rules=None):
+        return cls(random_ensemble(n_boards, n_cells_x, n_cells_y, density, seed), rules)
+
+    def __len__(self):
+        return len(self.states)
+
+    def step(self):
+        self.states = step_ensemble(self.states, self.tables)
+        self.generation += 1
+        return self
+
+    # live cells of every board
+    def population(self):
+        return self.states.sum(axis=(1, 2), dtype=np.int64)
+
+    # run n generations, returns the population of every board every
+    # `record_every` generations: populations[record, board], generation 0 first
+    def run(self, generations, record_every=1):
+        records = [self.population()]
+        for generation in range(1, generations + 1):
+            self.step()
+            if generation % record_every == 0 or generation == generations:
+                records.append(self.population())
+        return np.stack(records)
+
+
+# per-board statistics of a populations[record, board] history
+def population_stats(populations):
+    return {
+        "initial_population": populations[0],
+        "final_population": populations[-1],
+        "min_population": populations.min(axis=0),
+        "max_population": populations.max(axis=0),
+        "mean_population": populations.mean(axis=0),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run many small Game of Life boards at once.")
+    parser.add_argument("--boards", type=int, default=1000, help="number of boards (default: 1000)")
+    parser.add_argument("--size", type=int, nargs=2, default=(40, 30), metavar=("CELLS_X", "CELLS_Y"),
+                        help="size of every board in cells (default: 40 30)")
+    parser.add_argument("--generations", type=int, default=100, help="generations to run (default: 100)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed of the initial boards")
+    parser.add_argument("--density", type=float, nargs="+", default=[0.2], metavar="DENSITY",
+                        help="fraction of live cells, or LOW HIGH to spread the boards over a range (default: 0.2)")
+    parser.add_argument("--rule", nargs="+", default=None, metavar="RULE",
+                        help="Life-like rule(s), e.g. B36/S23; several rules are assigned to the boards in turn")
+    parser.add_argument("--record-every", type=int, default=1,
+                        help="sample the populations every N generations for the statistics (default: 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if len(args.density) > 2:
+        raise ValueError("Invalid density: give one value or a LOW HIGH range")
+    densities = np.linspace(args.density[0], args.density[-1], args.boards)
+    rules = None
+    if args.rule:
+        rules = [args.rule[board % len(args.rule)] for board in range(args.boards)]
+
+    ensemble = Ensemble.random(args.boards, *args.size, density=densities, seed=args.seed, rules=rules)
+    stats = population_stats(ensemble.run(args.generations, args.record_every))
+
+    # one JSON line per board
+    for board in range(len(ensemble)):
+        line = {"board": board, "density": round(float(densities[board]), 6)}
+        if rules:
+            line["rule"] = str(as_rule(rules[board]))
+        line.update({name: values[board].item() for name, values in stats.items()})
+        print(json.dumps(line))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
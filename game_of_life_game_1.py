@@ -1,20 +1,38 @@
 import pygame
 import numpy as np
 
-# Initialize Pygame
-pygame.init()
+from game_of_life_boards import (random_board, make_board, step_board, advance_board,
+                                 board_to_array, close_board)
+from game_of_life_renderer import BoardRenderer
+from game_of_life_patterns import load_pattern
 
 # Screen dimensions
 width, height = 800, 600
-screen = pygame.display.set_mode((width, height))
 
 # Grid dimensions
 n_cells_x, n_cells_y = 40, 30
 cell_width = width // n_cells_x
 cell_height = height // n_cells_y
 
-# Game state
-game_state = np.random.choice([0, 1], size=(n_cells_x, n_cells_y), p=[0.8, 0.2])
+# Board representation: "dense" numpy array, "bitpacked" (64 cells per word),
+# "sparse" (only recomputes regions that changed last generation),
+# "parallel" (bands stepped by a pool of worker processes)
+# or "hashlife" (memoized quadtree)
+board_type = "dense"
+# worker processes for the "parallel" board (None uses all cores, 1 is single-process)
+workers = None
+
+# Life-like rule as a B/S rulestring, e.g. "B3/S23" (Conway) or "B36/S23" (HighLife)
+rule = "B3/S23"
+
+# RLE (.rle) or plaintext pattern file to start from, None for a random board
+pattern_file = None
+
+# Game state, created in main()
+game_state = None
+
+# Generations to jump ahead when pressing "J" (uses the HashLife engine)
+jump_generations = 1000
 
 # Colors
 white = (255, 255, 255)
@@ -26,14 +44,14 @@ green = (0, 255, 0)
 button_width, button_height = 200, 50
 button_x, button_y = (width - button_width) // 2, height - button_height - 10
 
-def draw_button():
+def draw_button(screen):
     pygame.draw.rect(screen, green, (button_x, button_y, button_width, button_height))
     font = pygame.font.Font(None, 36)
     text = font.render("Next Generation", True, black)
     text_rect = text.get_rect(center=(button_x + button_width // 2, button_y + button_height // 2))
     screen.blit(text, text_rect)
 
-def draw_grid():
+def draw_grid(screen):
     for y in range(0, height, cell_height):
         for x in range(0, width, cell_width):
             cell = pygame.Rect(x, y, cell_width, cell_height)
@@ -41,50 +59,63 @@ def draw_grid():
 
 def next_generation():
     global game_state
-    new_state = np.copy(game_state)
+    game_state = step_board(game_state, rule)
 
-    for y in range(n_cells_y):
-        for x in range(n_cells_x):
-            n_neighbors = game_state[(x - 1) % n_cells_x, (y - 1) % n_cells_y] + \
-                          game_state[(x)     % n_cells_x, (y - 1) % n_cells_y] + \
-                          game_state[(x + 1) % n_cells_x, (y - 1) % n_cells_y] + \
-                          game_state[(x - 1) % n_cells_x, (y)     % n_cells_y] + \
-                          game_state[(x + 1) % n_cells_x, (y)     % n_cells_y] + \
-                          game_state[(x - 1) % n_cells_x, (y + 1) % n_cells_y] + \
-                          game_state[(x)     % n_cells_x, (y + 1) % n_cells_y] + \
-                          game_state[(x + 1) % n_cells_x, (y + 1) % n_cells_y]
-
-            if game_state[x, y] == 1 and (n_neighbors < 2 or n_neighbors > 3):
-                new_state[x, y] = 0
-            elif game_state[x, y] == 0 and n_neighbors == 3:
-                new_state[x, y] = 1
-
-    game_state = new_state
-
-def draw_cells():
+# advance the board by n generations at once with HashLife
+def advance_generations(n):
+    global game_state
+    game_state = advance_board(game_state, n, rule)
+
+def draw_cells(screen):
     for y in range(n_cells_y):
         for x in range(n_cells_x):
             cell = pygame.Rect(x * cell_width, y * cell_height, cell_width, cell_height)
             if game_state[x, y] == 1:
                 pygame.draw.rect(screen, black, cell)
 
-running = True
-while running:
-    screen.fill(white)
-    draw_grid()
-    draw_cells()
-    draw_button()
-    pygame.display.flip()
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if button_x <= event.pos[0] <= button_x + button_width and button_y <= event.pos[1] <= button_y + button_height:
-                next_generation()
-            else:
-                x, y = event.pos[0] // cell_width, event.pos[1] // cell_height
-                game_state[x, y] = not game_state[x, y]
-
-pygame.quit()
+def main():
+    global game_state
 
+    # Initialize Pygame
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    clock = pygame.time.Clock()
+
+    if pattern_file:
+        state = load_pattern(pattern_file).place_centered(np.zeros((n_cells_x, n_cells_y), dtype=np.int64))
+        game_state = make_board(state, board_type, workers, rule)
+    else:
+        game_state = random_board(n_cells_x, n_cells_y, 0.2, None, board_type, workers, rule)
+
+    # cached grid and button, only redraws the cells that changed
+    renderer = BoardRenderer(screen, n_cells_x, n_cells_y, cell_width, cell_height,
+                             (button_x, button_y, button_width, button_height),
+                             background=white, grid_color=gray, cell_color=black, button_color=green)
+
+    running = True
+    while running:
+        dirty = renderer.draw(board_to_array(game_state))
+        if dirty:
+            pygame.display.update(dirty)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_j:
+                advance_generations(jump_generations)
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if button_x <= event.pos[0] <= button_x + button_width and button_y <= event.pos[1] <= button_y + button_height:
+                    next_generation()
+                else:
+                    x, y = event.pos[0] // cell_width, event.pos[1] // cell_height
+                    game_state[x, y] = not game_state[x, y]
+
+        clock.tick(60)
+
+    close_board(game_state)
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
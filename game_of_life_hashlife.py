@@ -0,0 +1,308 @@
+import numpy as np
+
+# HashLife engine for the Game of Life: a memoized quadtree that advances
+# a board by 2^j generations per lookup.
+#
+# The toroidal board of game_of_life_game_1.py is treated as an infinite
+# plane tiled with copies of the board, so quadtree nodes at any level are
+# just squares of that periodic plane. The memoization is most effective
+# when the board dimensions have large power-of-two factors (e.g. 1024x512),
+# since tile-aligned squares then collapse to a single canonical node.
+#
+# Quadtree orientation follows the display: x grows to the east, y to the
+# south, and arrays are indexed [x, y] like game_state.
+#
+# What it is for: boards whose content is regular or settles down (still
+# lifes, oscillators, gliders and guns on a mostly empty board) advanced by
+# many generations at once, where it is orders of magnitude faster than
+# stepping. On chaotic boards (random soups) few squares repeat, every node
+# is new, and it is several times to ~100x slower than the dense engine
+# (e.g. a 128x128 soup for 1000 generations: 3.5 s against 0.1 s), so use the
+# dense, bit-packed or parallel boards there.
+
+
+class _Node:
+    __slots__ = ("level", "nw", "ne", "sw", "se", "pop", "index")
+
+    def __init__(self, level, nw, ne, sw, se, pop, index):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        # number of live cells
+        self.pop = pop
+        # cell bits of level 1 (2x2) and level 2 (4x4) nodes, bit = y * size + x
+        self.index = index
+
+
+_DEAD = _Node(0, None, None, None, None, 0, 0)
+_ALIVE = _Node(0, None, None, None, None, 1, 1)
+
+
+# spread the 4 bits of a 2x2 index into the nw corner of a 4x4 index
+def _spread(index):
+    return (index & 1) | ((index >> 1) & 1) << 1 | ((index >> 2) & 1) << 4 | ((index >> 3) & 1) << 5
+
+
+# the cells of every 4x4 block: _BLOCKS[index, x, y]
+def _build_blocks():
+    indices = np.arange(1 << 16, dtype=np.uint32)
+    cells = ((indices[:, None] >> np.arange(16, dtype=np.uint32)) & 1).astype(np.uint8)
+    return cells.reshape(-1, 4, 4).transpose(0, 2, 1).copy()
+
+
+_BLOCKS = _build_blocks()
+
+
+# precomputed one-generation results of every 4x4 block:
+# the 2x2 center after one step, as a level 1 index;
+# `rule` is a Rule from game_of_life_rules.py, None is Conway's Game of Life
+def _build_results(rule=None):
+    cells = _BLOCKS
+    results = np.zeros(1 << 16, dtype=np.uint8)
+    for bit, (x, y) in enumerate(((1, 1), (2, 1), (1, 2), (2, 2))):
+        neighbors = cells[:, x - 1:x + 2, y - 1:y + 2].sum(axis=(1, 2)) - cells[:, x, y]
+        if rule is None:
+            alive = (neighbors == 3) | ((cells[:, x, y] == 1) & (neighbors == 2))
+        else:
+            alive = rule.apply(cells[:, x, y], neighbors)
+        results |= alive.astype(np.uint8) << bit
+    return results
+
+
+_RESULTS = _build_results()
+# result tables of other rules, built on first use
+_RULE_RESULTS = {}
+
+
+def _results_for(rule):
+    if rule is None or rule.is_conway:
+        return _RESULTS
+    results = _RULE_RESULTS.get(rule)
+    if results is None:
+        results = _RULE_RESULTS[rule] = _build_results(rule)
+    return results
+
+
+class HashLife:
+    def __init__(self, state, max_nodes=500_000, rule=None):
+        self.n_cells_x, self.n_cells_y = state.shape
+        self.dtype = state.dtype
+        self.generation = 0
+        self.rule = rule
+        self._rule_results = _results_for(rule)
+        # with B0 rules empty space does not stay empty
+        self._empty_is_stable = rule is None or rule.table[0, 0] == 0
+        # bound of the canonical node table, checked between two jumps of
+        # advance(): once it is exceeded the node table and the result memo
+        # are dropped before the next jump. A single jump is never
+        # interrupted, dropping the memo in the middle of one would make it
+        # redo the work it memoized.
+        self.max_nodes = max_nodes
+        self.evictions = 0
+        self._state = np.array(state, dtype=np.uint8)
+        self._reset_caches()
+
+    @property
+    def shape(self):
+        return self.n_cells_x, self.n_cells_y
+
+    @property
+    def cache_size(self):
+        return len(self._nodes)
+
+    def _reset_caches(self):
+        self._nodes = {}
+        self._results = {}
+        self._level1 = {}
+        self._level2 = {}
+        self._empties = [_DEAD]
+
+    def _evict(self):
+        self._reset_caches()
+        self.evictions += 1
+
+    # canonical node with the given quadrants
+    def _join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            level = nw.level + 1
+            if level == 1:
+                index = nw.pop | ne.pop << 1 | sw.pop << 2 | se.pop << 3
+            elif level == 2:
+                index = (_spread(nw.index) | _spread(ne.index) << 2 |
+                         _spread(sw.index) << 8 | _spread(se.index) << 10)
+            else:
+                index = -1
+            node = _Node(level, nw, ne, sw, se, nw.pop + ne.pop + sw.pop + se.pop, index)
+            self._nodes[key] = node
+        return node
+
+    def _empty(self, level):
+        while len(self._empties) <= level:
+            smaller = self._empties[-1]
+            self._empties.append(self._join(smaller, smaller, smaller, smaller))
+        return self._empties[level]
+
+    def _node_level1(self, index):
+        node = self._level1.get(index)
+        if node is None:
+            leaves = [_ALIVE if index >> bit & 1 else _DEAD for bit in range(4)]
+            node = self._level1[index] = self._join(*leaves)
+        return node
+
+    def _node_level2(self, index):
+        node = self._level2.get(index)
+        if node is None:
+            quadrants = []
+            for shift in (0, 2, 8, 10):
+                quad = index >> shift
+                quadrants.append(self._node_level1((quad & 3) | (quad >> 4 & 3) << 2))
+            node = self._level2[index] = self._join(*quadrants)
+        return node
+
+    def _center(self, node):
+        return self._join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    # center of a level k node (level k-1) advanced by 2^j generations, j <= k-2
+    def _advance(self, node, j):
+        level = node.level
+        if node.pop == 0 and self._empty_is_stable:
+            return self._empty(level - 1)
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        if level == 2:
+            result = self._node_level1(int(self._rule_results[node.index]))
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            join = self._join
+            # the 9 overlapping level k-1 subsquares
+            n00, n02, n20, n22 = nw, ne, sw, se
+            n01 = join(nw.ne, ne.nw, nw.se, ne.sw)
+            n10 = join(nw.sw, nw.se, sw.nw, sw.ne)
+            n11 = join(nw.se, ne.sw, sw.ne, se.nw)
+            n12 = join(ne.sw, ne.se, se.nw, se.ne)
+            n21 = join(sw.ne, se.nw, sw.se, se.sw)
+            subsquares = (n00, n01, n02, n10, n11, n12, n20, n21, n22)
+
+            # first half: advance each by 2^(k-3), or just re-center for smaller steps
+            if j == level - 2:
+                c = [self._advance(sub, j - 1) for sub in subsquares]
+                j_second = j - 1
+            else:
+                c = [self._center(sub) for sub in subsquares]
+                j_second = j
+
+            # second half: combine into 4 level k-1 nodes and advance those
+            result = join(
+                self._advance(join(c[0], c[1], c[3], c[4]), j_second),
+                self._advance(join(c[1], c[2], c[4], c[5]), j_second),
+                self._advance(join(c[3], c[4], c[6], c[7]), j_second),
+                self._advance(join(c[4], c[5], c[7], c[8]), j_second),
+            )
+
+        self._results[key] = result
+        return result
+
+    # quadtree of the periodic plane, level `level`, with its nw corner at torus (ox, oy)
+    def _build_periodic(self, level, ox, oy):
+        n_x, n_y = self.n_cells_x, self.n_cells_y
+        state = self._state
+
+        # 4x4 block index at every offset of the torus
+        blocks = np.zeros((n_x, n_y), dtype=np.uint16)
+        for y in range(4):
+            for x in range(4):
+                shifted = np.roll(state, (-x, -y), axis=(0, 1)).astype(np.uint16)
+                blocks |= shifted << (y * 4 + x)
+
+        memo = {}
+
+        def build(level, ox, oy):
+            key = (level, ox, oy)
+            node = memo.get(key)
+            if node is None:
+                if level == 2:
+                    node = self._node_level2(int(blocks[ox, oy]))
+                else:
+                    half = 1 << (level - 1)
+                    ex, sy = (ox + half) % n_x, (oy + half) % n_y
+                    node = self._join(build(level - 1, ox, oy), build(level - 1, ex, oy),
+                                      build(level - 1, ox, sy), build(level - 1, ex, sy))
+                memo[key] = node
+            return node
+
+        return build(level, ox % n_x, oy % n_y)
+
+    # write the cells of `node`, whose nw corner is at (x0, y0), into `out` (clipped)
+    def _fill(self, node, x0, y0, out):
+        n_x, n_y = out.shape
+        if node.pop == 0 or x0 >= n_x or y0 >= n_y:
+            return
+        if node.level == 2:
+            block = _BLOCKS[node.index]
+            w, h = min(4, n_x - x0), min(4, n_y - y0)
+            out[x0:x0 + w, y0:y0 + h] = block[:w, :h]
+            return
+        half = 1 << (node.level - 1)
+        self._fill(node.nw, x0, y0, out)
+        self._fill(node.ne, x0 + half, y0, out)
+        self._fill(node.sw, x0, y0 + half, out)
+        self._fill(node.se, x0 + half, y0 + half, out)
+
+    # advance the board by 2^j generations
+    def _advance_power(self, j):
+        if len(self._nodes) >= self.max_nodes:
+            self._evict()
+        size = max(self.n_cells_x, self.n_cells_y, 4)
+        level = max(j + 2, (size - 1).bit_length() + 1)
+        # position the root so that its center starts at torus (0, 0)
+        offset = -(1 << (level - 2))
+        root = self._build_periodic(level, offset, offset)
+        result = self._advance(root, j)
+
+        state = np.zeros(self.shape, dtype=np.uint8)
+        self._fill(result, 0, 0, state)
+        self._state = state
+        self.generation += 1 << j
+
+    # advance the board by n generations (in power-of-two jumps)
+    def advance(self, n):
+        if n < 0:
+            raise ValueError("Cannot advance a negative number of generations")
+        j = 0
+        while n:
+            if n & 1:
+                self._advance_power(j)
+            n >>= 1
+            j += 1
+        return self
+
+    def step(self):
+        return self.advance(1)
+
+    def __getitem__(self, pos):
+        return int(self._state[pos])
+
+    def __setitem__(self, pos, value):
+        self._state[pos] = 1 if value else 0
+
+    # set many cells alive at once (coordinate arrays)
+    def set_cells(self, xs, ys):
+        self._state[xs, ys] = 1
+
+    def population(self):
+        return int(self._state.sum(dtype=np.int64))
+
+    @classmethod
+    def from_array(cls, state, **kwargs):
+        return cls(state, **kwargs)
+
+    # the current board as a dense 0/1 array indexed [x, y]
+    def to_array(self, dtype=None):
+        return self._state.astype(self.dtype if dtype is None else dtype)
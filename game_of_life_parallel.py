@@ -0,0 +1,136 @@
+import os
+import numpy as np
+
+from multiprocessing import Pool, shared_memory
+
+from game_of_life_engine import count_neighbors, step
+
+# Multi-core Game of Life stepping.
+# The board lives in two shared memory buffers (current and next generation).
+# Every generation each worker reads a band of rows (axis 0) plus one halo
+# row on each side from the current buffer, and writes its band into the
+# next buffer; then the buffers swap roles. Only band bounds are sent to the
+# workers, the board itself is never pickled. The board wraps around like
+# the dense engine.
+
+# shared buffers attached in each worker process, and the rule table
+_worker_buffers = []
+_worker_rule = None
+
+
+def _attach(names, shape, rule):
+    global _worker_rule
+    _worker_rule = rule
+    for name in names:
+        memory = shared_memory.SharedMemory(name=name)
+        _worker_buffers.append((memory, np.ndarray(shape, dtype=np.uint8, buffer=memory.buf)))
+
+
+# compute rows [x0, x1) of the next generation from buffer `src` into buffer `dst`
+def _step_band(task):
+    x0, x1, src, dst = task
+    current = _worker_buffers[src][1]
+    # the band with one wrapped halo row on each side
+    window = current.take(range(x0 - 1, x1 + 1), axis=0, mode="wrap")
+    neighbors = count_neighbors(window)[1:-1]
+    band = window[1:-1]
+    if _worker_rule is not None:
+        _worker_buffers[dst][1][x0:x1] = _worker_rule.apply(band, neighbors)
+    else:
+        _worker_buffers[dst][1][x0:x1] = (neighbors == 3) | ((band == 1) & (neighbors == 2))
+
+
+class ParallelLife:
+    def __init__(self, state, workers=None, rule=None):
+        self.dtype = state.dtype
+        self.rule = rule
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._shape = state.shape
+        self._pool = None
+
+        if self.workers == 1:
+            # deterministic single-process fallback, no shared memory needed
+            self._memory = []
+            self._buffers = [np.array(state, dtype=np.uint8)]
+        else:
+            size = max(1, int(np.prod(state.shape)))
+            self._memory = [shared_memory.SharedMemory(create=True, size=size) for _ in range(2)]
+            self._buffers = [np.ndarray(state.shape, dtype=np.uint8, buffer=memory.buf)
+                             for memory in self._memory]
+            self._buffers[0][:] = state
+            self._pool = Pool(self.workers, initializer=_attach,
+                              initargs=([memory.name for memory in self._memory], state.shape, rule))
+
+            # one band per worker, the rows split as evenly as possible
+            bounds = np.linspace(0, state.shape[0], min(self.workers, state.shape[0]) + 1).astype(int)
+            self._bands = list(zip(bounds[:-1], bounds[1:]))
+        self._current = 0
+
+    @property
+    def shape(self):
+        return self._shape
+
+    # the current generation (a view into the shared buffer)
+    @property
+    def state(self):
+        return self._buffers[self._current]
+
+    @classmethod
+    def from_array(cls, state, **kwargs):
+        return cls(state, **kwargs)
+
+    def to_array(self, dtype=None):
+        return self.state.astype(self.dtype if dtype is None else dtype)
+
+    def __getitem__(self, pos):
+        return int(self.state[pos])
+
+    def __setitem__(self, pos, value):
+        self.state[pos] = 1 if value else 0
+
+    def toggle(self, x, y):
+        self.state[x, y] ^= 1
+
+    # set many cells alive at once (coordinate arrays)
+    def set_cells(self, xs, ys):
+        self.state[xs, ys] = 1
+
+    def population(self):
+        return int(self.state.sum(dtype=np.int64))
+
+    # advance the board by one generation in place
+    def step(self):
+        if self._pool is None:
+            self._buffers[0] = step(self._buffers[0], self.rule)
+            return self
+
+        src, dst = self._current, 1 - self._current
+        self._pool.map(_step_band, [(x0, x1, src, dst) for x0, x1 in self._bands])
+        self._current = dst
+        return self
+
+    def advance(self, n):
+        for _ in range(n):
+            self.step()
+        return self
+
+    # stop the workers and release the shared memory
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._memory:
+            # keep the last generation readable after closing
+            self._buffers = [self.state.copy()]
+            self._current = 0
+            for memory in self._memory:
+                memory.close()
+                memory.unlink()
+            self._memory = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
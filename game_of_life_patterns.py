@@ -0,0 +1,275 @@
+import re
+
+import numpy as np
+
+from game_of_life_bitboard import BitBoard, WORD_BITS
+from game_of_life_boards import place_cells, board_to_array
+
+# Import and export of standard Life pattern formats:
+#   RLE        (.rle)           x = 3, y = 3, rule = B3/S23
+#                               bo$2bo$3o!
+#   plaintext  (.cells / .txt)  !Name: Glider
+#                               .O.
+#                               ..O
+#                               OOO
+# The parsers work on the raw bytes with numpy and produce coordinate arrays
+# of the live cells, no Python object is built per cell. Pattern x grows to
+# the right and y downwards, matching boards indexed [x, y].
+
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[list(b" \t\n")] = True
+_POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+_RLE_HEADER = re.compile(rb"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*([^\s]+))?", re.IGNORECASE)
+
+
+# the rule of a pattern header without its bounded grid suffix ("B3/S23:T40,30")
+def _strip_grid(rule):
+    return rule.split(":", 1)[0].strip() or None
+
+
+class Pattern:
+    def __init__(self, xs, ys, width, height, name=None, rule=None):
+        # coordinates of the live cells
+        self.xs = xs
+        self.ys = ys
+        self.width = width
+        self.height = height
+        self.name = name
+        self.rule = rule
+
+    @property
+    def population(self):
+        return len(self.xs)
+
+    # the pattern as a dense 0/1 array indexed [x, y]
+    def to_array(self, dtype=np.int64):
+        state = np.zeros((self.width, self.height), dtype=dtype)
+        state[self.xs, self.ys] = 1
+        return state
+
+    # place the pattern on a board (any board type) with its top left corner at (x, y),
+    # wrapping around the board edges
+    def place(self, board, x=0, y=0):
+        return place_cells(board, self.xs + x, self.ys + y)
+
+    # place the pattern in the middle of a board
+    def place_centered(self, board):
+        n_x, n_y = board.shape
+        return self.place(board, (n_x - self.width) // 2, (n_y - self.height) // 2)
+
+
+def _read_bytes(source):
+    if hasattr(source, "read"):
+        data = source.read()
+    else:
+        with open(source, "rb") as file:
+            data = file.read()
+    return data.encode() if isinstance(data, str) else data
+
+
+# byte positions where each line starts, and the line of every byte
+def _lines(data):
+    newlines = np.flatnonzero(data == ord("\n"))
+    starts = np.concatenate(([0], newlines + 1))
+    line_of = np.zeros(len(data), dtype=np.int64)
+    line_of[newlines[newlines + 1 < len(data)] + 1] = 1
+    return starts, np.cumsum(line_of)
+
+
+def read_rle(source):
+    data = _read_bytes(source).replace(b"\r", b"")
+    name = rule = None
+    width = height = None
+
+    # comment lines and the header line come first, the cells follow
+    body_start = 0
+    while body_start < len(data):
+        line_end = data.find(b"\n", body_start)
+        if line_end == -1:
+            line_end = len(data)
+        line = data[body_start:line_end]
+        stripped = line.strip()
+        if stripped.startswith(b"#"):
+            if stripped[:2] in (b"#N", b"#n"):
+                name = stripped[2:].strip().decode(errors="replace")
+            elif stripped[:2] in (b"#r", b"#R") and rule is None:
+                rule = _strip_grid(stripped[2:].decode(errors="replace"))
+        elif stripped:
+            header = _RLE_HEADER.match(stripped)
+            if header is None:
+                raise ValueError("Invalid RLE pattern: missing 'x = ..., y = ...' header")
+            width, height = int(header.group(1)), int(header.group(2))
+            if header.group(3):
+                rule = _strip_grid(header.group(3).decode(errors="replace"))
+            body_start = line_end + 1
+            break
+        body_start = line_end + 1
+
+    if width is None:
+        raise ValueError("Invalid RLE pattern: missing 'x = ..., y = ...' header")
+
+    body = data[body_start:]
+    end = body.find(b"!")
+    if end != -1:
+        body = body[:end]
+    tokens = np.frombuffer(body, dtype=np.uint8)
+    tokens = tokens[~_WHITESPACE[tokens]]
+
+    # split the body into run counts and tags ("b" dead, "$" end of line, other letters alive)
+    is_digit = (tokens >= ord("0")) & (tokens <= ord("9"))
+    if len(tokens) and is_digit[-1]:
+        raise ValueError("Invalid RLE pattern: run count without a tag at the end")
+    tag_positions = np.flatnonzero(~is_digit)
+    tags = tokens[tag_positions]
+
+    # run count of every tag: the digits before it (1 if there are none)
+    digit_positions = np.flatnonzero(is_digit)
+    tag_of_digit = np.cumsum(~is_digit, dtype=np.int32)[digit_positions]
+    place = tag_positions[tag_of_digit] - digit_positions - 1
+    values = (tokens[digit_positions] - ord("0")) * _POWERS_OF_TEN[place]
+    counts = np.bincount(tag_of_digit, weights=values, minlength=len(tags)).astype(np.int64)
+    counts[counts == 0] = 1
+
+    # y of every tag: the number of line ends before it;
+    # x: the cells advanced since the start of its line
+    is_newline = tags == ord("$")
+    ys = np.cumsum(np.where(is_newline, counts, 0))
+    advance = np.where(is_newline, 0, counts)
+    after = np.cumsum(advance)
+    line_bases = np.concatenate(([0], after[is_newline]))
+    line_of_tag = np.cumsum(is_newline, dtype=np.int32)
+
+    # expand the runs of live cells into cell coordinates
+    alive = np.flatnonzero((tags != ord("b")) & ~is_newline)
+    run_length = counts[alive]
+    run_x = after[alive] - run_length - line_bases[line_of_tag[alive]]
+    run_starts = np.cumsum(run_length) - run_length
+    run_offsets = np.arange(run_starts[-1] + run_length[-1] if len(alive) else 0) - np.repeat(run_starts, run_length)
+    cell_xs = np.repeat(run_x, run_length) + run_offsets
+    cell_ys = np.repeat(ys[alive], run_length)
+    return Pattern(cell_xs, cell_ys, width, height, name=name, rule=rule)
+
+
+def read_plaintext(source):
+    data = np.frombuffer(_read_bytes(source).replace(b"\r", b""), dtype=np.uint8)
+    if len(data) == 0:
+        return Pattern(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), 0, 0)
+
+    starts, line_of = _lines(data)
+    is_comment = data[np.minimum(starts, len(data) - 1)] == ord("!")
+    is_comment[starts >= len(data)] = False
+
+    name = None
+    for comment in np.flatnonzero(is_comment)[:16]:
+        end = starts[comment + 1] - 1 if comment + 1 < len(starts) else len(data)
+        line = data[starts[comment]:end].tobytes()
+        if line.startswith(b"!Name:"):
+            name = line[6:].strip().decode(errors="replace")
+            break
+
+    # row of every line once comment lines are skipped
+    row_of_line = np.cumsum(~is_comment) - 1
+    alive = (data == ord("O")) | (data == ord("*"))
+    alive &= ~is_comment[line_of]
+    positions = np.flatnonzero(alive)
+    xs = positions - starts[line_of[positions]]
+    ys = row_of_line[line_of[positions]]
+
+    # the pattern size: longest pattern line, number of pattern lines
+    line_lengths = np.diff(np.concatenate((starts, [len(data) + 1]))) - 1
+    pattern_lines = np.flatnonzero(~is_comment & (starts < len(data)))
+    width = int(line_lengths[pattern_lines].max()) if len(pattern_lines) else 0
+    height = len(pattern_lines)
+    return Pattern(xs, ys, width, height, name=name)
+
+
+# load a pattern file, the format is chosen by the file extension
+def load_pattern(path):
+    if str(path).lower().endswith(".rle"):
+        return read_rle(path)
+    return read_plaintext(path)
+
+
+# the board in bands of pattern lines (board columns y): yields (y0, cells)
+# with cells[x, y - y0]. A BitBoard is unpacked one band of 64 lines at a
+# time, other boards are turned into one dense array.
+def _line_bands(board):
+    if isinstance(board, BitBoard):
+        for word in range(board.n_words):
+            y0 = word * WORD_BITS
+            # the word of every x, as 8 little-endian bytes
+            column = board.words[:, word].astype("<u8").view(np.uint8).reshape(-1, 8)
+            count = min(WORD_BITS, board.n_cells_y - y0)
+            yield y0, np.unpackbits(column, axis=1, count=count, bitorder="little")
+    else:
+        yield 0, board_to_array(board)
+
+
+def _open_for_writing(target):
+    if hasattr(target, "write"):
+        return target, False
+    return open(target, "w"), True
+
+
+# write a board (any board type) as RLE, streaming one board row at a time
+def write_rle(board, target, name=None, rule="B3/S23", line_width=70):
+    n_x, n_y = board.shape
+    file, owned = _open_for_writing(target)
+    try:
+        if name:
+            file.write(f"#N {name}\n")
+        file.write(f"x = {n_x}, y = {n_y}, rule = {rule}\n")
+
+        line = []
+        line_length = 0
+        last_row = 0
+
+        def emit(token):
+            nonlocal line_length
+            if line_length + len(token) > line_width:
+                file.write("".join(line) + "\n")
+                line.clear()
+                line_length = 0
+            line.append(token)
+            line_length += len(token)
+
+        def run(count, tag):
+            emit(f"{count}{tag}" if count > 1 else tag)
+
+        for y0, cells in _line_bands(board):
+            for dy in range(cells.shape[1]):
+                row = cells[:, dy] != 0
+                live = np.flatnonzero(row)
+                if len(live) == 0:
+                    continue
+                y = y0 + dy
+                if y > last_row:
+                    run(y - last_row, "$")
+                last_row = y
+
+                # runs of equal cells up to the last live cell of the row
+                row = row[:live[-1] + 1]
+                edges = np.concatenate(([0], np.flatnonzero(row[1:] != row[:-1]) + 1, [len(row)]))
+                for start, stop in zip(edges[:-1].tolist(), edges[1:].tolist()):
+                    run(stop - start, "o" if row[start] else "b")
+        emit("!")
+        file.write("".join(line) + "\n")
+    finally:
+        if owned:
+            file.close()
+
+
+# write a board (any board type) as plaintext, streaming one board row at a time
+def write_plaintext(board, target, name=None):
+    file, owned = _open_for_writing(target)
+    try:
+        if name:
+            file.write(f"!Name: {name}\n")
+        symbols = np.array([ord("."), ord("O")], dtype=np.uint8)
+        for _, cells in _line_bands(board):
+            for dy in range(cells.shape[1]):
+                file.write(symbols[(cells[:, dy] != 0).astype(np.uint8)].tobytes().decode() + "\n")
+    finally:
+        if owned:
+            file.close()
@@ -0,0 +1,95 @@
+import pygame
+import numpy as np
+
+# Cached rendering for the Game of Life display.
+# The grid and the button are rendered once to cached surfaces. After the
+# first frame only the cells that flipped since the last frame are redrawn,
+# and draw() returns the dirty rectangles for pygame.display.update().
+# Full redraws (first frame, or many changed cells) transfer the whole
+# board to the screen with a single array-to-surface blit.
+
+
+class BoardRenderer:
+    def __init__(self, screen, n_cells_x, n_cells_y, cell_width, cell_height, button_rect,
+                 button_text="Next Generation", background=(255, 255, 255), grid_color=(128, 128, 128),
+                 cell_color=(0, 0, 0), button_color=(0, 255, 0), text_color=(0, 0, 0),
+                 full_redraw_fraction=0.02):
+        self.screen = screen
+        self.n_cells_x = n_cells_x
+        self.n_cells_y = n_cells_y
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.button_rect = pygame.Rect(button_rect)
+        self.cell_color = cell_color
+        # redraw everything when more than this fraction of the cells changed
+        self.full_redraw_fraction = full_redraw_fraction
+
+        width, height = screen.get_size()
+
+        # background: empty cells with their grid lines
+        self._grid = pygame.Surface((width, height)).convert(screen)
+        self._grid.fill(background)
+        for y in range(0, height, cell_height):
+            for x in range(0, width, cell_width):
+                pygame.draw.rect(self._grid, grid_color, (x, y, cell_width, cell_height), 1)
+
+        # button with its text, rendered once
+        self._button = pygame.Surface(self.button_rect.size).convert(screen)
+        self._button.fill(button_color)
+        font = pygame.font.Font(None, 36)
+        text = font.render(button_text, True, text_color)
+        self._button.blit(text, text.get_rect(center=(self.button_rect.width // 2, self.button_rect.height // 2)))
+
+        # one pixel per cell: live cells in the cell color, dead cells transparent
+        self._key = background if background != cell_color else grid_color
+        self._cells = pygame.Surface((n_cells_x, n_cells_y)).convert(screen)
+        self._cells.set_colorkey(self._key)
+        self._cell_pixels = np.array([self._cells.map_rgb(self._key), self._cells.map_rgb(cell_color)],
+                                     dtype=np.uint32)
+
+        # the board as it is currently shown on screen
+        self._drawn = None
+
+    # force a full redraw on the next frame
+    def invalidate(self):
+        self._drawn = None
+
+    def _draw_full(self, state):
+        self.screen.blit(self._grid, (0, 0))
+        pygame.surfarray.blit_array(self._cells, self._cell_pixels[state.astype(np.uint8)])
+        board_size = (self.n_cells_x * self.cell_width, self.n_cells_y * self.cell_height)
+        self.screen.blit(pygame.transform.scale(self._cells, board_size), (0, 0))
+        self.screen.blit(self._button, self.button_rect)
+        return [self.screen.get_rect()]
+
+    def _draw_changed(self, state, xs, ys):
+        dirty = []
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            cell = pygame.Rect(x * self.cell_width, y * self.cell_height, self.cell_width, self.cell_height)
+            if state[x, y]:
+                self.screen.fill(self.cell_color, cell)
+            else:
+                self.screen.blit(self._grid, cell, cell)
+            dirty.append(cell)
+
+        # keep the button on top of the cells below it
+        if self.button_rect.collidelist(dirty) != -1:
+            self.screen.blit(self._button, self.button_rect)
+            dirty.append(self.button_rect)
+        return dirty
+
+    # draw the board (0/1 array indexed [x, y]), returns the rectangles that changed
+    def draw(self, state):
+        state = np.asarray(state) != 0
+        if self._drawn is None:
+            dirty = self._draw_full(state)
+        else:
+            xs, ys = np.nonzero(state != self._drawn)
+            if len(xs) == 0:
+                return []
+            if len(xs) > self.full_redraw_fraction * state.size:
+                dirty = self._draw_full(state)
+            else:
+                dirty = self._draw_changed(state, xs, ys)
+        self._drawn = state
+        return dirty
@@ -0,0 +1,66 @@
+import re
+
+import numpy as np
+
+# Life-like rules given as B/S rulestrings, e.g. "B3/S23" (Conway's Game of
+# Life), "B36/S23" (HighLife) or the older survival/birth form "23/3".
+# A rule is compiled once into a lookup table indexed by
+# [cell state, number of live neighbours], so the next generation of a whole
+# board is a single gather: rule.table[state, neighbors].
+
+_BS_NOTATION = re.compile(r"^B([0-8]*)/?S([0-8]*)$", re.IGNORECASE)
+_SB_NOTATION = re.compile(r"^([0-8]*)/([0-8]*)$")
+
+
+class Rule:
+    def __init__(self, birth, survival):
+        self.birth = frozenset(birth)
+        self.survival = frozenset(survival)
+        # table[0, n]: a dead cell with n neighbours is born
+        # table[1, n]: a live cell with n neighbours survives
+        self.table = np.zeros((2, 9), dtype=np.uint8)
+        self.table[0, sorted(self.birth)] = 1
+        self.table[1, sorted(self.survival)] = 1
+
+    @classmethod
+    def parse(cls, rulestring):
+        text = rulestring.strip()
+        match = _BS_NOTATION.match(text)
+        if match:
+            birth, survival = match.groups()
+        else:
+            match = _SB_NOTATION.match(text)
+            if match is None:
+                raise ValueError(f"Invalid rulestring: {rulestring}")
+            survival, birth = match.groups()
+        return cls((int(n) for n in birth), (int(n) for n in survival))
+
+    # the next state of every cell from its state and neighbour count
+    def apply(self, state, neighbors):
+        return self.table[state, neighbors]
+
+    @property
+    def is_conway(self):
+        return self == CONWAY
+
+    def __eq__(self, other):
+        return isinstance(other, Rule) and (self.birth, self.survival) == (other.birth, other.survival)
+
+    def __hash__(self):
+        return hash((self.birth, self.survival))
+
+    def __str__(self):
+        return "B" + "".join(map(str, sorted(self.birth))) + "/S" + "".join(map(str, sorted(self.survival)))
+
+    def __repr__(self):
+        return f"Rule.parse({str(self)!r})"
+
+
+CONWAY = Rule((3,), (2, 3))
+
+
+# accept a Rule, a rulestring or None (Conway's Game of Life)
+def as_rule(rule):
+    if rule is None or isinstance(rule, Rule):
+        return rule
+    return Rule.parse(rule)
@@ -0,0 +1,165 @@
+import mmap
+import zlib
+import struct
+
+import numpy as np
+
+# On-disk history of a Game of Life run, with random access by generation.
+#
+# File layout:
+#   header   magic, version, n_cells_x, n_cells_y, keyframe interval, index offset
+#   frames   frame header (generation, kind, length) + zlib-compressed bit-packed data;
+#            every `keyframe_interval`-th frame is a full board (keyframe), the
+#            others are the XOR with the previous frame (delta)
+#   index    number of frames + one (generation, offset, length, kind) entry per frame
+#
+# Frames are appended while the run goes on; the index is written on close.
+# Files without an index (run interrupted) are still readable, the reader
+# then rebuilds the index by walking the frame headers.
+# The reader memory-maps the file, so reading generation k only touches the
+# nearest keyframe before k and the deltas up to k.
+
+MAGIC = b"GOLSNAP1"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sHIIIQ")
+_FRAME_HEADER = struct.Struct("<qBI")
+_COUNT = struct.Struct("<Q")
+_INDEX_DTYPE = np.dtype([("generation", "<i8"), ("offset", "<u8"), ("length", "<u4"), ("kind", "u1")])
+
+KEYFRAME = 0
+DELTA = 1
+
+
+def _pack(state):
+    return np.packbits(np.asarray(state, dtype=bool).ravel(), bitorder="little")
+
+
+class SnapshotWriter:
+    def __init__(self, path, shape, keyframe_interval=64, compress_level=1):
+        self.path = path
+        self.shape = tuple(shape)
+        self.keyframe_interval = keyframe_interval
+        self.compress_level = compress_level
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self.shape[0], self.shape[1], keyframe_interval, 0))
+        self._index = []
+        self._previous = None
+
+    def __len__(self):
+        return len(self._index)
+
+    # append the board of the given generation (generations must increase)
+    def write(self, state, generation):
+        if state.shape != self.shape:
+            raise ValueError(f"Board shape {state.shape} does not match the history shape {self.shape}")
+        if self._index and generation <= self._index[-1][0]:
+            raise ValueError("Generations must be written in increasing order")
+
+        packed = _pack(state)
+        if len(self._index) % self.keyframe_interval == 0:
+            kind, data = KEYFRAME, packed
+        else:
+            kind, data = DELTA, packed ^ self._previous
+        data = zlib.compress(data.tobytes(), self.compress_level)
+
+        offset = self._file.tell()
+        self._file.write(_FRAME_HEADER.pack(generation, kind, len(data)))
+        self._file.write(data)
+        self._index.append((generation, offset + _FRAME_HEADER.size, len(data), kind))
+        self._previous = packed
+
+    def close(self):
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(_COUNT.pack(len(self._index)))
+        self._file.write(np.array(self._index, dtype=_INDEX_DTYPE).tobytes())
+        # point the header at the index
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self.shape[0], self.shape[1],
+                                      self.keyframe_interval, index_offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SnapshotReader:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_x, n_y, self.keyframe_interval, index_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a Game of Life history file")
+        self.shape = (n_x, n_y)
+
+        if index_offset:
+            count, = _COUNT.unpack_from(self._map, index_offset)
+            self._index = np.frombuffer(self._map, dtype=_INDEX_DTYPE, count=count,
+                                        offset=index_offset + _COUNT.size).copy()
+        else:
+            self._index = self._scan()
+        self.generations = self._index["generation"]
+
+        # last decoded frame, so scrubbing forward only applies the new deltas
+        self._cached_frame = None
+        self._cached_packed = None
+
+    # rebuild the index of a file that was not closed properly
+    def _scan(self):
+        entries = []
+        offset = _HEADER.size
+        while offset + _FRAME_HEADER.size <= len(self._map):
+            generation, kind, length = _FRAME_HEADER.unpack_from(self._map, offset)
+            offset += _FRAME_HEADER.size
+            if offset + length > len(self._map):
+                break
+            entries.append((generation, offset, length, kind))
+            offset += length
+        return np.array(entries, dtype=_INDEX_DTYPE)
+
+    def __len__(self):
+        return len(self._index)
+
+    def _frame_data(self, frame):
+        entry = self._index[frame]
+        start = int(entry["offset"])
+        data = zlib.decompress(self._map[start:start + int(entry["length"])])
+        return np.frombuffer(data, dtype=np.uint8)
+
+    # the board of the given generation as a dense 0/1 array indexed [x, y]
+    def read(self, generation, dtype=np.int64):
+        frame = int(np.searchsorted(self.generations, generation))
+        if frame == len(self.generations) or self.generations[frame] != generation:
+            raise KeyError(f"Generation {generation} is not in {self.path}")
+
+        keyframe = frame - frame % self.keyframe_interval
+        cached = self._cached_frame
+        if cached is not None and keyframe <= cached <= frame:
+            start, packed = cached + 1, self._cached_packed.copy()
+        else:
+            start, packed = keyframe + 1, self._frame_data(keyframe).copy()
+        for delta in range(start, frame + 1):
+            packed ^= self._frame_data(delta)
+
+        self._cached_frame, self._cached_packed = frame, packed
+        n_x, n_y = self.shape
+        cells = np.unpackbits(packed, count=n_x * n_y, bitorder="little")
+        return cells.reshape(n_x, n_y).astype(dtype)
+
+    def close(self):
+        if not self._file.closed:
+            self._map.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
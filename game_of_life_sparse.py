@@ -0,0 +1,118 @@
+import numpy as np
+
+from game_of_life_engine import count_neighbors, step
+
+# Sparse Game of Life stepping: only tiles that can change are recomputed.
+# A cell can only change if something in its 3x3 neighbourhood changed in
+# the last generation, so each step recomputes the tiles that changed last
+# generation plus their 8 neighbour tiles, and skips stable regions.
+# The board is indexed [x, y] and wraps around like the dense engine.
+
+
+class SparseLife:
+    def __init__(self, state, tile_size=32, dense_threshold=0.5, rule=None):
+        self.dtype = state.dtype
+        self.rule = rule
+        self.state = np.array(state, dtype=np.uint8)
+        self.tile_size = tile_size
+        # fall back to a full dense step when more than this fraction of tiles is active
+        self.dense_threshold = dense_threshold
+
+        n_x, n_y = self.state.shape
+        self.n_tiles_x = -(-n_x // tile_size)
+        self.n_tiles_y = -(-n_y // tile_size)
+        # tiles that changed in the last generation (all of them to start with)
+        self.changed = np.ones((self.n_tiles_x, self.n_tiles_y), dtype=bool)
+        # statistics of the last step
+        self.active_fraction = 1.0
+        self.last_step_dense = False
+
+    @property
+    def shape(self):
+        return self.state.shape
+
+    @classmethod
+    def from_array(cls, state, **kwargs):
+        return cls(state, **kwargs)
+
+    def to_array(self, dtype=None):
+        return self.state.astype(self.dtype if dtype is None else dtype)
+
+    def __getitem__(self, pos):
+        return int(self.state[pos])
+
+    def __setitem__(self, pos, value):
+        x, y = pos
+        self.state[x, y] = 1 if value else 0
+        self.changed[x // self.tile_size, y // self.tile_size] = True
+
+    def toggle(self, x, y):
+        self[x, y] = not self.state[x, y]
+
+    # set many cells alive at once (coordinate arrays)
+    def set_cells(self, xs, ys):
+        self.state[xs, ys] = 1
+        self.changed[np.asarray(xs) // self.tile_size, np.asarray(ys) // self.tile_size] = True
+
+    # call after modifying .state directly, so every tile gets recomputed
+    def mark_all_active(self):
+        self.changed[:] = True
+
+    def population(self):
+        return int(self.state.sum(dtype=np.int64))
+
+    # per tile: does `cells` have any True value in it
+    def _tile_any(self, cells):
+        size = self.tile_size
+        n_x, n_y = cells.shape
+        padded = np.zeros((self.n_tiles_x * size, self.n_tiles_y * size), dtype=bool)
+        padded[:n_x, :n_y] = cells
+        return padded.reshape(self.n_tiles_x, size, self.n_tiles_y, size).any(axis=(1, 3))
+
+    def _step_dense(self):
+        new_state = step(self.state, self.rule)
+        self.changed = self._tile_any(new_state != self.state)
+        self.state = new_state
+
+    def _step_tiles(self, tiles_x, tiles_y):
+        size = self.tile_size
+        n_x, n_y = self.state.shape
+
+        # gather every active tile with a 1-cell halo, wrapping around the board;
+        # partial tiles at the board edge wrap too, which only recomputes a
+        # few cells twice with the same result
+        offsets = np.arange(-1, size + 1)
+        xs = (tiles_x[:, None] * size + offsets) % n_x
+        ys = (tiles_y[:, None] * size + offsets) % n_y
+        windows = self.state[xs[:, :, None], ys[:, None, :]]
+
+        neighbors = np.zeros((len(tiles_x), size, size), dtype=np.uint8)
+        for dx in (0, 1, 2):
+            for dy in (0, 1, 2):
+                if dx == 1 and dy == 1:
+                    continue
+                neighbors += windows[:, dx:dx + size, dy:dy + size]
+
+        old = windows[:, 1:-1, 1:-1]
+        if self.rule is not None:
+            new = self.rule.apply(old, neighbors)
+        else:
+            new = ((neighbors == 3) | ((old == 1) & (neighbors == 2))).astype(np.uint8)
+
+        self.state[xs[:, 1:-1, None], ys[:, None, 1:-1]] = new
+        self.changed = np.zeros_like(self.changed)
+        self.changed[tiles_x, tiles_y] = (new != old).any(axis=(1, 2))
+
+    # advance the board by one generation in place
+    def step(self):
+        # tiles next to a changed tile (on the wrapped tile grid) may change
+        active = self.changed | (count_neighbors(self.changed) > 0)
+        self.active_fraction = active.mean()
+        self.last_step_dense = self.active_fraction > self.dense_threshold
+
+        if self.last_step_dense:
+            self._step_dense()
+        elif self.active_fraction > 0:
+            tiles_x, tiles_y = np.nonzero(active)
+            self._step_tiles(tiles_x, tiles_y)
+        return self
@@ -0,0 +1,48 @@
+import pytest
+
+from Observer_Pattern_async import AsyncDispatcher
+
+
+class RecordingObserver:
+    def __init__(self):
+        self.changes = []
+
+    def update(self, subject, changes=None):
+        self.changes.append(changes)
+
+
+class UnhashableObserver(RecordingObserver):
+    __hash__ = None
+
+
+@pytest.mark.parametrize("workers", [2, 3, 4, 8])
+def test_observers_spread_across_workers(workers):
+    observers = [RecordingObserver() for _ in range(1000)]
+    with AsyncDispatcher(workers) as dispatcher:
+        for observer in observers:
+            dispatcher.submit(observer, None, {"x": (0, 1)})
+        sizes = dispatcher.shard_sizes()
+    assert sum(sizes) == len(observers)
+    assert max(sizes) - min(sizes) <= 1
+
+
+@pytest.mark.parametrize("workers", [2, 4, 8])
+def test_unhashable_observers_spread_across_workers(workers):
+    observers = [UnhashableObserver() for _ in range(1000)]
+    with AsyncDispatcher(workers) as dispatcher:
+        used = {id(dispatcher._shard(observer)) for observer in observers}
+    assert len(used) == workers
+
+
+@pytest.mark.parametrize("policy", ["block", "drop-oldest", "coalesce"])
+def test_notifications_keep_their_order_per_observer(policy):
+    observers = [RecordingObserver() for _ in range(20)]
+    with AsyncDispatcher(4, max_queue=8, policy=policy) as dispatcher:
+        for i in range(200):
+            for observer in observers:
+                dispatcher.submit(observer, None, {"x": (i, i + 1)})
+        assert dispatcher.wait_idle(10)
+    for observer in observers:
+        values = [changes["x"][1] for changes in observer.changes]
+        assert values == sorted(values)
+        assert values[-1] == 200
@@ -0,0 +1,49 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+
+from batch_rasterizer import BatchRasterizer
+from Observer_Pattern_bulk import RectangleGroup
+
+SIZE = (320, 240)
+
+
+def _group(n, rasterizer=None):
+    rng = np.random.default_rng(0)
+    group = RectangleGroup(16, rng=1, rasterizer=rasterizer)
+    group.add_many(rng.integers(-20, SIZE[0], n), rng.integers(-20, SIZE[1], n),
+                   rng.integers(0, 40, n), rng.integers(0, 40, n), rng.integers(0, 256, (n, 3)))
+    return group
+
+
+def _draw(group):
+    surface = pygame.Surface(SIZE, depth=32)
+    surface.fill((255, 255, 255))
+    group.draw(surface)
+    return pygame.image.tobytes(surface, "RGB")
+
+
+@pytest.mark.parametrize("n", [0, 1, 50, 2000])
+def test_batched_draw_matches_pygame(n):
+    batched = _group(n, BatchRasterizer(min_batch=0, pixels_per_shape=None))
+    with_pygame = _group(n, BatchRasterizer(min_batch=n + 1))
+    assert _draw(batched) == _draw(with_pygame)
+
+
+def test_small_groups_are_not_batched():
+    group = _group(2000)
+    surface = pygame.Surface(SIZE, depth=32)
+    assert not group.rasterizer.use_batch(surface, 2000)
+    assert group.rasterizer.use_batch(surface, SIZE[0] * SIZE[1])
+
+
+def test_update_recolors_every_rectangle():
+    group = _group(100)
+    old = group.color
+    group.update(None)
+    assert group.color is not old
+    assert len(group) == 100 and group.capacity >= 100
@@ -0,0 +1,140 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+
+from Factory_Pattern_3 import Circle, Rectangle
+from batch_rasterizer import BatchRasterizer
+from Factory_Pattern_shape_store import ShapeStore
+
+SIZE = (320, 240)
+
+SURFACES = {
+    "32bit": lambda: pygame.Surface(SIZE, depth=32),
+    "24bit": lambda: pygame.Surface(SIZE, depth=24),
+    "srcalpha": lambda: pygame.Surface(SIZE, pygame.SRCALPHA),
+    "odd_size": lambda: pygame.Surface((133, 97), depth=32),
+}
+
+CLIPS = [
+    None,
+    pygame.Rect(40, 30, 150, 100),
+    pygame.Rect(-20, -20, 80, 60),
+    pygame.Rect(300, 200, 100, 100),
+    pygame.Rect(10, 10, 0, 50),
+]
+
+
+def _surface(kind, clip):
+    surface = SURFACES[kind]()
+    surface.fill((255, 255, 255))
+    if clip is not None:
+        surface.set_clip(clip)
+    return surface
+
+
+def _pixels(surface):
+    return pygame.image.tobytes(surface, "RGBA")
+
+
+def _random_shapes(seed, n):
+    rng = random.Random(seed)
+    shapes = []
+    for _ in range(n):
+        cls = rng.choice([Circle, Rectangle])
+        shapes.append(cls(rng.randint(-60, SIZE[0] + 60), rng.randint(-60, SIZE[1] + 60), rng))
+    return shapes
+
+
+def _draw_both(shapes, kind, clip):
+    expected = _surface(kind, clip)
+    for shape in shapes:
+        shape.draw(expected)
+    actual = _surface(kind, clip)
+    BatchRasterizer(min_batch=0, pixels_per_shape=None).draw_shapes(actual, shapes)
+    return expected, actual
+
+
+@pytest.mark.parametrize("kind", SURFACES)
+def test_circles_of_every_radius_match_pygame(kind):
+    rng = random.Random(0)
+    shapes = []
+    for radius in range(0, 121):
+        circle = Circle(0, 0, rng)
+        circle.x = rng.randint(-100, SIZE[0] + 100)
+        circle.y = rng.randint(-100, SIZE[1] + 100)
+        circle.radius = radius
+        shapes.append(circle)
+    expected, actual = _draw_both(shapes, kind, None)
+    assert _pixels(actual) == _pixels(expected)
+
+
+@pytest.mark.parametrize("kind", SURFACES)
+@pytest.mark.parametrize("clip", CLIPS)
+@pytest.mark.parametrize("seed", range(5))
+def test_random_scenes_match_pygame(kind, clip, seed):
+    expected, actual = _draw_both(_random_shapes(seed, 150), kind, clip)
+    assert _pixels(actual) == _pixels(expected)
+
+
+def test_empty_and_degenerate_shapes():
+    rectangle = Rectangle(10, 10, random.Random(0))
+    rectangle.width = 0
+    circle = Circle(50, 50, random.Random(0))
+    circle.radius = 0
+    expected, actual = _draw_both([rectangle, circle], "32bit", None)
+    assert _pixels(actual) == _pixels(expected)
+    expected, actual = _draw_both([], "32bit", None)
+    assert _pixels(actual) == _pixels(expected)
+
+
+@pytest.mark.parametrize("kind", SURFACES)
+@pytest.mark.parametrize("clip", CLIPS[:3])
+def test_draw_store_matches_draw_shapes(kind, clip):
+    store = ShapeStore(rng=np.random.default_rng(1))
+    rng = np.random.default_rng(2)
+    n = 2000
+    store.append_random(rng.integers(1, 3, n), rng.integers(0, SIZE[0], n), rng.integers(0, SIZE[1], n))
+    rasterizer = BatchRasterizer(min_batch=0, pixels_per_shape=None)
+
+    from_store = _surface(kind, clip)
+    rasterizer.draw_store(from_store, store)
+    from_views = _surface(kind, clip)
+    rasterizer.draw_shapes(from_views, store.views(range(len(store))))
+    with_pygame = _surface(kind, clip)
+    for view in store:
+        view.draw(with_pygame)
+
+    assert _pixels(from_store) == _pixels(from_views) == _pixels(with_pygame)
+
+
+def test_draw_store_rows():
+    store = ShapeStore(rng=np.random.default_rng(3))
+    rng = np.random.default_rng(4)
+    store.append_random(rng.integers(1, 3, 500), rng.integers(0, SIZE[0], 500), rng.integers(0, SIZE[1], 500))
+    rasterizer = BatchRasterizer(min_batch=0, pixels_per_shape=None)
+
+    actual = _surface("32bit", None)
+    rasterizer.draw_store(actual, store, slice(100, 300))
+    expected = _surface("32bit", None)
+    for view in store.views(range(100, 300)):
+        view.draw(expected)
+    assert _pixels(actual) == _pixels(expected)
+
+
+def test_small_batches_fall_back_to_pygame():
+    rasterizer = BatchRasterizer()
+    surface = _surface("32bit", None)
+    assert not rasterizer.use_batch(surface, 0)
+    assert not rasterizer.use_batch(surface, rasterizer.min_batch - 1)
+    # 320x240 pixels need one shape per 50 pixels
+    assert not rasterizer.use_batch(surface, 1000)
+    assert rasterizer.use_batch(surface, 320 * 240 // 50)
+    surface.set_clip(pygame.Rect(0, 0, 100, 100))
+    assert rasterizer.use_batch(surface, rasterizer.min_batch)
+    assert not rasterizer.use_batch(_surface("24bit", None), 100_000)
+    assert BatchRasterizer(min_batch=0, pixels_per_shape=None).use_batch(surface, 1)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from game_of_life_engine import step, step_reference
+from game_of_life_rules import as_rule
+
+SHAPES = [(1, 1), (1, 7), (7, 1), (2, 2), (3, 3), (4, 5), (65, 130)]
+
+
+def _random_board(shape, seed, density=0.35):
+    rng = np.random.default_rng(seed)
+    # int64 0/1 array, like game_state in game_of_life_game_1.py
+    return (rng.random(shape) < density).astype(np.int64)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("seed", range(3))
+def test_step_matches_reference(shape, seed):
+    state = _random_board(shape, seed)
+    expected = state
+    for _ in range(6):
+        state = step(state)
+        expected = step_reference(expected)
+        assert state.dtype == expected.dtype == np.int64
+        assert state.shape == expected.shape
+        assert np.array_equal(state, expected)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_step_with_conway_rule_matches_reference(shape):
+    state = _random_board(shape, 7)
+    expected = state
+    rule = as_rule("B3/S23")
+    for _ in range(4):
+        state = step(state, rule)
+        expected = step_reference(expected)
+        assert state.dtype == np.int64
+        assert np.array_equal(state, expected)
+
+
+def test_step_keeps_the_input():
+    state = _random_board((10, 12), 1)
+    before = state.copy()
+    step(state)
+    assert np.array_equal(state, before)